@@ -0,0 +1,349 @@
+"""
+Agrégats incrémentaux : chaque match est réduit une seule fois en un petit
+« partiel » fusionnable (sommes et compteurs par équipe, joueur, rôle,
+champion et composition), conservé dans un cache process-wide.
+
+Les partiels forment un monoïde : merge_partials(a, b) est associatif et
+empty_partial() est l'élément neutre. Ajouter une game ou changer de filtre
+revient donc à fusionner des partiels existants, sans re-parcourir les
+participants bruts.
+
+Structure d'un partiel :
+    {
+        "matches":   nombre de matchs avec nos joueurs,
+        "wins":      nombre de victoires,
+        "team":      {champ numérique: somme sur notre équipe, "GAME_MINUTES": ...},
+        "players":   {PLAYER: {"Kills", "Deaths", "Assists", "Gold", "Damage",
+                               "Vision", "ControlWards", "KDA", "KP", "NbGames"}},
+        "roles":     {ROLE: {"Gold", "Damage", "Games"}},
+        "champions": {(PLAYER, SKIN): {"games", "wins"}},
+        "comps":     {(TOP, JUNGLE, MIDDLE, BOTTOM, UTILITY): {"games", "wins", "files"}},
+        "duos":      {(ROLE_A, ROLE_B): {(CHAMP_A, CHAMP_B): {"games", "wins"}}},
+        "matchups":  {ROLE: {(NOTRE_CHAMP, CHAMP_ADVERSE): {"games", "wins",
+                             "GOLD_DIFF_AT_15", "CS_DIFF_AT_15", "GOLD_DIFF",
+                             "lane_games": {"GOLD_DIFF_AT_15", "CS_DIFF_AT_15"}}}},
+    }
+
+"files" est le tuple des fichiers de match où la composition a été jouée ;
+"duos" indexe chaque paire de rôles de ROLE_PAIRS (ex : JUNGLE + MIDDLE,
+BOTTOM + UTILITY) avec les champions joués ensemble.
+
+"matchups" est une matrice creuse par rôle (notre champion × champion adverse
+du même rôle) : "Top contre Renekton" est une simple recherche. Les diffs à
+15 minutes viennent des champs du match ; ils ne sont sommés que sur les
+games qui les contiennent, comptées dans "lane_games". GOLD_DIFF est l'écart
+de gold en fin de partie avec l'adversaire direct.
+"""
+import threading
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import profiled
+from participants import NUMERIC_FIELDS, ROLES, build_match_table, roster_view
+
+# Statistiques joueur -> colonne source de la table des participants
+PLAYER_FIELDS = {
+    "Kills":        "CHAMPIONS_KILLED",
+    "Deaths":       "NUM_DEATHS",
+    "Assists":      "ASSISTS",
+    "Gold":         "GOLD_EARNED",
+    "Damage":       "TOTAL_DAMAGE_DEALT_TO_CHAMPIONS",
+    "Vision":       "VISION_SCORE",
+    "ControlWards": "VISION_WARDS_BOUGHT_IN_GAME",
+}
+
+# Diffs de lane cumulés dans les matchups (champs de la table des participants)
+LANE_DIFF_FIELDS = ["GOLD_DIFF_AT_15", "CS_DIFF_AT_15"]
+
+# Paires de rôles indexées pour les duos, dans l'ordre de ROLES
+ROLE_PAIRS = list(combinations(ROLES, 2))
+
+
+def empty_partial():
+    return {
+        "matches":   0,
+        "wins":      0,
+        "team":      {},
+        "players":   {},
+        "roles":     {},
+        "champions": {},
+        "comps":     {},
+        "duos":      {},
+        "matchups":  {},
+    }
+
+
+def _add_into(target, source):
+    """
+    Ajoute récursivement les valeurs de `source` dans `target` (en place) :
+    les nombres sont sommés, les tuples concaténés.
+    """
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _add_into(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, type(value)()) + value
+
+
+@profiled("fusion des partiels")
+def merge_partials(partials):
+    """
+    Fusionne une séquence de partiels en un nouveau partiel.
+    """
+    merged = empty_partial()
+    for partial in partials:
+        _add_into(merged, partial)
+    return merged
+
+
+def reduce_matches(table):
+    """
+    Réduit une table de participants (passée par roster_view)
+    en partiels, un par fichier de match. Les matchs sans nos joueurs donnent
+    un partiel vide, pour ne pas être recalculés.
+
+    Retourne {fname: partiel}.
+    """
+    fname_of = table.groupby("match")["fname"].first().astype(str)
+    partials = {fname: empty_partial() for fname in fname_of}
+
+    match_stats = build_match_table(table)
+    team_fields = list(NUMERIC_FIELDS) + ["GAME_MINUTES"]
+    for match, row in match_stats[team_fields + ["WIN"]].to_dict("index").items():
+        partial = partials[fname_of[match]]
+        partial["matches"] = 1
+        partial["wins"] = int(row.pop("WIN"))
+        partial["team"] = row
+
+    # Joueurs (tous les participants de notre roster) : stats + Kill Participation
+    roster = table[table["IS_ROSTER"]]
+    match_team_kills = roster["match"].map(match_stats["CHAMPIONS_KILLED"]).fillna(0).to_numpy()
+    kills_assists = (roster["CHAMPIONS_KILLED"] + roster["ASSISTS"]).to_numpy()
+    kp = np.where(match_team_kills > 0, kills_assists / np.maximum(match_team_kills, 1) * 100, 0.0)
+    kda = np.round(kills_assists / np.maximum(roster["NUM_DEATHS"].to_numpy(), 1), 2)
+
+    names = roster["PLAYER"].astype(str).to_numpy()
+    skins = roster["SKIN"].astype(str).to_numpy()
+    roles = roster["ROLE"].astype(str).to_numpy()
+    wins = roster["WIN"].to_numpy()
+    matches = roster["match"].to_numpy()
+    sources = {stat: roster[field].to_numpy() for stat, field in PLAYER_FIELDS.items()}
+
+    for i in range(len(roster)):
+        partial = partials[fname_of[matches[i]]]
+        stats = {stat: values[i].item() for stat, values in sources.items()}
+        stats["KDA"] = kda[i].item()
+        stats["KP"] = kp[i].item()
+        stats["NbGames"] = 1
+        _add_into(partial["players"], {names[i]: stats})
+
+        _add_into(partial["champions"], {(names[i], skins[i]): {"games": 1, "wins": int(wins[i])}})
+
+        if roles[i]:
+            _add_into(partial["roles"], {roles[i]: {
+                "Gold": stats["Gold"], "Damage": stats["Damage"], "Games": 1
+            }})
+
+    # Composition de notre équipe (en cas de doublon de rôle, le dernier l'emporte)
+    ours = table[table["OUR_TEAM"] & (table["ROLE"] != "")]
+    drafts = (
+        ours.drop_duplicates(["match", "ROLE"], keep="last")
+            .pivot(index="match", columns="ROLE", values="SKIN")
+            .reindex(index=match_stats.index, columns=ROLES)
+            .astype(object)
+            .fillna("")
+    )
+    positions = {role: i for i, role in enumerate(ROLES)}
+    for match, comp in zip(drafts.index, drafts.itertuples(index=False, name=None)):
+        fname = fname_of[match]
+        win = int(match_stats.at[match, "WIN"])
+        partials[fname]["comps"] = {tuple(comp): {"games": 1, "wins": win, "files": (fname,)}}
+        partials[fname]["duos"] = {
+            (role_a, role_b): {(comp[positions[role_a]], comp[positions[role_b]]): {"games": 1, "wins": win}}
+            for role_a, role_b in ROLE_PAIRS
+            if comp[positions[role_a]] and comp[positions[role_b]]
+        }
+
+    # Matchups : notre joueur face au joueur adverse du même rôle
+    enemies = table[
+        ~table["OUR_TEAM"] & (table["ROLE"] != "") & table["match"].isin(match_stats.index)
+    ]
+    lanes = ours.drop_duplicates(["match", "ROLE"], keep="last").merge(
+        enemies.drop_duplicates(["match", "ROLE"], keep="last"),
+        on=["match", "ROLE"],
+        suffixes=("", "_ENEMY")
+    )
+    gold_diff = (lanes["GOLD_EARNED"] - lanes["GOLD_EARNED_ENEMY"]).to_numpy()
+    lane_diffs = {field: lanes[field].to_numpy() for field in LANE_DIFF_FIELDS}
+    for i, (match, role, champ, enemy, win) in enumerate(zip(
+        lanes["match"], lanes["ROLE"].astype(str), lanes["SKIN"].astype(str),
+        lanes["SKIN_ENEMY"].astype(str), lanes["WIN"]
+    )):
+        diffs = {field: values[i].item() for field, values in lane_diffs.items()}
+        stats = {field: 0.0 if np.isnan(value) else value for field, value in diffs.items()}
+        stats["lane_games"] = {field: int(not np.isnan(value)) for field, value in diffs.items()}
+        stats.update(games=1, wins=int(win), GOLD_DIFF=gold_diff[i].item())
+        _add_into(partials[fname_of[match]]["matchups"], {role: {(champ, enemy): stats}})
+
+    return partials
+
+
+class PartialCache:
+    """
+    Cache des partiels par match, indexé par (dossier, roster, fichier,
+    signature) : seuls les matchs nouveaux ou modifiés sont réduits.
+    """
+
+    def __init__(self):
+        self._partials = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, folder, present, files, roster_key, reduce_missing):
+        """
+        Partiels des fichiers `present` : ceux absents du cache sont calculés
+        par reduce_missing(fichiers manquants) -> {fname: partiel}.
+        """
+        def key_of(fname):
+            return (folder, roster_key, fname, files[fname])
+
+        with self._lock:
+            missing = [fname for fname in present if key_of(fname) not in self._partials]
+            self.hits += len(present) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = reduce_missing(missing)
+            with self._lock:
+                for fname, partial in computed.items():
+                    self._partials[key_of(fname)] = partial
+
+        with self._lock:
+            # Oublie les versions précédentes / fichiers supprimés de ce dossier
+            current = {key_of(fname) for fname in present}
+            for key in [k for k in self._partials if k[:2] == (folder, roster_key) and k not in current]:
+                del self._partials[key]
+            return {fname: self._partials[key_of(fname)] for fname in present}
+
+    def partials_for_rosters(self, folder, table, sides, files, roster_key):
+        """
+        Partiels de chaque roster depuis une table passée par tag_rosters :
+        chaque roster ne réduit que les matchs où il est présent. La vue du
+        roster (roster_view, une copie) n'est construite que sur les matchs
+        dont le partiel manque : un rerun sans nouvelle game ne copie rien.
+
+        roster_key : configuration des rosters (rosters.rosters_key), aussi
+        utilisée comme clé de cache.
+        Retourne {nom du roster: {fname: partiel}}.
+        """
+        fname_of = table.groupby("match")["fname"].first().astype(str)
+        roster_of = sides.index.get_level_values("ROSTER")
+        matches_of = sides.index.get_level_values("match")
+
+        def reducer(name, players):
+            def reduce_missing(missing):
+                subset = table[table["fname"].isin(missing)]
+                return reduce_matches(roster_view(subset, sides, name, [entry[0] for entry in players]))
+            return reduce_missing
+
+        result = {}
+        for name, players in roster_key:
+            present = set(fname_of.reindex(matches_of[roster_of == name]).dropna()) & set(files)
+            result[name] = self._lookup(folder, present, files, (name, players), reducer(name, players))
+        return result
+
+    def stats(self):
+        """
+        Compteurs cumulés : partiels réutilisés (hits) et matchs réduits (misses).
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._partials.clear()
+
+
+def players_frame(partial, order=None):
+    """
+    Stats cumulées par joueur d'un partiel fusionné (index PLAYER), dans
+    l'ordre `order` si fourni.
+    """
+    players = pd.DataFrame.from_dict(partial["players"], orient="index")
+    if order is not None:
+        players = players.reindex([name for name in order if name in partial["players"]])
+    return players
+
+
+def roles_frame(partial):
+    """
+    Gold / dégâts / nombre de games cumulés par rôle (index ROLES).
+    """
+    roles = pd.DataFrame.from_dict(partial["roles"], orient="index", columns=["Gold", "Damage", "Games"])
+    return roles.reindex(ROLES, fill_value=0)
+
+
+def champions_frame(partial):
+    """
+    Une ligne par (PLAYER, SKIN) avec games / wins.
+    """
+    rows = [
+        {"PLAYER": player, "SKIN": skin, "games": stats["games"], "wins": stats["wins"]}
+        for (player, skin), stats in partial["champions"].items()
+    ]
+    return pd.DataFrame(rows, columns=["PLAYER", "SKIN", "games", "wins"])
+
+
+def comps_frame(partial):
+    """
+    Une ligne par composition (colonnes ROLES) avec Games / Wins / Winrate
+    et la liste des fichiers de match (Files).
+    """
+    rows = [
+        dict(zip(ROLES, comp), Games=stats["games"], Wins=stats["wins"], Files=list(stats["files"]))
+        for comp, stats in partial["comps"].items()
+    ]
+    comps = pd.DataFrame(rows, columns=ROLES + ["Games", "Wins", "Files"])
+    comps["Winrate"] = comps["Wins"] / comps["Games"] * 100
+    return comps
+
+
+def duos_frame(partial, role_a, role_b):
+    """
+    Une ligne par duo de champions joué sur la paire de rôles (role_a, role_b)
+    avec Games / Wins / Winrate.
+    """
+    rows = [
+        {role_a: champ_a, role_b: champ_b, "Games": stats["games"], "Wins": stats["wins"]}
+        for (champ_a, champ_b), stats in partial["duos"].get((role_a, role_b), {}).items()
+    ]
+    duos = pd.DataFrame(rows, columns=[role_a, role_b, "Games", "Wins"])
+    duos["Winrate"] = duos["Wins"] / duos["Games"] * 100
+    return duos
+
+
+def matchups_frame(partial, role):
+    """
+    Une ligne par (notre champion, champion adverse) sur le rôle `role` avec
+    Games / Wins / Winrate et les diffs moyens (par game). Un diff de lane
+    est moyenné sur les games qui le contiennent (NaN si aucune).
+    """
+    rows = [
+        {
+            "Champion": champ, "Adversaire": enemy,
+            "Games": stats["games"], "Wins": stats["wins"],
+            **{
+                field: stats[field] / stats["lane_games"][field] if stats["lane_games"][field] else np.nan
+                for field in LANE_DIFF_FIELDS
+            },
+            "GOLD_DIFF": stats["GOLD_DIFF"] / stats["games"]
+        }
+        for (champ, enemy), stats in partial["matchups"].get(role, {}).items()
+    ]
+    columns = ["Champion", "Adversaire", "Games", "Wins"] + LANE_DIFF_FIELDS + ["GOLD_DIFF"]
+    matchups = pd.DataFrame(rows, columns=columns)
+    matchups["Winrate"] = matchups["Wins"] / matchups["Games"] * 100
+    return matchups
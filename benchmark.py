@@ -0,0 +1,235 @@
+"""
+Benchmark des chemins d'ingestion et d'agrégation sur des matchs synthétiques.
+
+Les matchs sont générés à partir d'un fichier réel (même schéma de ~191
+champs par participant) : rôles, champions, résultat et champs numériques
+sont tirés au hasard, avec une graine fixe pour des runs comparables. Chaque
+étape est chronométrée séparément :
+
+    discovery : scan du dossier (scan_folder)
+    decode    : lecture + décodage JSON à froid (MatchCache, projection)
+    table     : table des participants + identification des rosters (tag_rosters)
+    reduce    : réduction en partiels par match (PartialCache, à froid)
+    rerun     : même appel sur le cache chaud (rerun sans nouvelle game)
+    tab1      : fusion des partiels + stats équipe / joueurs / rôles / champions
+    tab3      : moyennes par joueur (onglet Tournoi)
+    tab4      : compositions, duos et matchups (onglet Drafts)
+
+Le résultat est écrit en JSON (stdout ou --output) pour comparer les runs.
+Avec --bundle, les matchs générés sont regroupés en un seul lot (voir
+bundles.py) avant d'être chronométrés.
+
+Usage :
+    python benchmark.py                     # 100, 1000 et 10000 games
+    python benchmark.py 100 1000 --output bench.json
+    python benchmark.py 1000 --bundle .jsonl.gz
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from aggregates import ROLE_PAIRS, PartialCache, merge_partials
+from bundles import BUNDLE_SUFFIXES, pack_folder
+from ingestion import JSON_BACKEND, MatchCache, scan_folder
+from participants import NUMERIC_FIELDS, PARTICIPANT_FIELDS, ROLES, build_participant_table, tag_rosters
+from rosters import IdentityIndex, rosters_key
+from stats import (
+    champion_pool, compositions, duos, matchups, player_averages, player_summary,
+    role_distribution, team_summary
+)
+
+BENCH_SIZES = [100, 1000, 10000]
+BENCH_TEMPLATE_DIR = "scrims_json"
+BENCH_SEED = 42
+GAMES_PER_DAY = 5
+
+# Roster synthétique : nos joueurs sont toujours ces 5 noms, reconnus par
+# PUUID comme ceux de rosters.json
+BENCH_ROSTER = [f"Joueur {i}" for i in range(1, 6)]
+BENCH_ROSTER_NAME = "Benchmark"
+BENCH_ROSTERS = {
+    BENCH_ROSTER_NAME: {
+        player: {"display": player, "puuids": [f"bench-{i}"], "aliases": [player]}
+        for i, player in enumerate(BENCH_ROSTER, start=1)
+    }
+}
+
+
+def load_template(template_dir=BENCH_TEMPLATE_DIR):
+    """
+    Retourne (match modèle, pool de champions) depuis les fichiers d'un dossier.
+    """
+    fnames = sorted(f for f in os.listdir(template_dir) if f.endswith(".json"))
+    if not fnames:
+        raise FileNotFoundError(f"Aucun fichier JSON modèle dans '{template_dir}'.")
+
+    champions = set()
+    template = None
+    for fname in fnames:
+        with open(os.path.join(template_dir, fname), "r", encoding="utf-8") as f:
+            match_data = json.load(f)
+        if template is None:
+            template = match_data
+        champions.update(p.get("SKIN") for p in match_data.get("participants", []) if p.get("SKIN"))
+    return template, sorted(champions)
+
+
+def generate_matches(folder, n_games, template, champions, seed=BENCH_SEED):
+    """
+    Écrit `n_games` fichiers 'DD_MM_YYYY_GX.json' dans `folder`, construits
+    sur le modèle `template` (tous ses champs sont conservés).
+    """
+    rng = random.Random(seed)
+    base = template["participants"][0]
+    first_day = date(2025, 1, 1)
+
+    for i in range(n_games):
+        day = first_day + timedelta(days=i // GAMES_PER_DAY)
+        fname = f"{day:%d_%m_%Y}_G{i % GAMES_PER_DAY + 1}.json"
+        our_side = rng.choice(["100", "200"])
+        winner = rng.choice(["100", "200"])
+        time_played = rng.randint(1200, 2400)
+        picks = rng.sample(champions, 10) if len(champions) >= 10 else [rng.choice(champions) for _ in range(10)]
+
+        participants = []
+        for j, (side, role) in enumerate((side, role) for side in ("100", "200") for role in ROLES):
+            p = dict(base)
+            for field, dtype in NUMERIC_FIELDS.items():
+                reference = float(base.get(field) or 0) or 10.0
+                value = reference * rng.uniform(0.5, 1.5)
+                if field.endswith("_DIFF_AT_15"):
+                    value = rng.uniform(-reference, reference)
+                p[field] = str(round(value, 1) if dtype == "float32" else int(value))
+            p.update({
+                "NAME": BENCH_ROSTER[j % 5] if side == our_side else f"Adversaire {j % 5 + 1}",
+                "PUUID": f"bench-{j % 5 + 1}" if side == our_side else f"adversaire-{j % 5 + 1}",
+                "TEAM": side,
+                "WIN": "Win" if side == winner else "Fail",
+                "TEAM_POSITION": role,
+                "INDIVIDUAL_POSITION": role,
+                "SKIN": picks[j],
+                "TIME_PLAYED": str(time_played),
+            })
+            participants.append(p)
+
+        match_data = dict(template)
+        match_data.update({
+            "matchId": f"BENCH_{i}",
+            "gameDuration": time_played * 1000,
+            "participants": participants
+        })
+        with open(os.path.join(folder, fname), "w", encoding="utf-8") as f:
+            json.dump(match_data, f)
+
+
+def _timed(stages, name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    stages[name] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def _tab1(partials):
+    totals = merge_partials(partials.values())
+    team_summary(totals)
+    player_summary(totals, BENCH_ROSTER)
+    role_distribution(totals)
+    champion_pool(totals)
+    return totals
+
+
+def _tab3(totals):
+    return player_averages(totals)
+
+
+def _tab4(totals):
+    compositions(totals)
+    for role_a, role_b in ROLE_PAIRS:
+        duos(totals, role_a, role_b)
+    for role in ROLES:
+        matchups(totals, role)
+
+
+def run_benchmark(n_games, template, champions, work_dir=None, bundle=None):
+    """
+    Génère `n_games` matchs (regroupés en un lot d'extension `bundle` si
+    fourni) puis chronomètre chaque étape. Retourne
+    {"games", "bundle", "files", "errors", "rows", "stages": {étape: secondes}}.
+    """
+    with tempfile.TemporaryDirectory(dir=work_dir) as folder:
+        generate_matches(folder, n_games, template, champions)
+        if bundle:
+            raw_folder, folder = folder, os.path.join(folder, "bundle")
+            os.makedirs(folder)
+            pack_folder(raw_folder, os.path.join(folder, f"matches{bundle}"))
+
+        stages = {}
+        files = _timed(stages, "discovery", scan_folder, folder)
+        entries, errors = _timed(
+            stages, "decode", MatchCache(fields=PARTICIPANT_FIELDS).load_files, folder, files
+        )
+        table, sides = _timed(
+            stages, "table", lambda: tag_rosters(build_participant_table(entries), IdentityIndex(BENCH_ROSTERS))
+        )
+        partial_cache = PartialCache()
+
+        def reduce():
+            return partial_cache.partials_for_rosters(
+                folder, table, sides, files, rosters_key(BENCH_ROSTERS)
+            )[BENCH_ROSTER_NAME]
+
+        partials = _timed(stages, "reduce", reduce)
+        _timed(stages, "rerun", reduce)
+        totals = _timed(stages, "tab1", _tab1, partials)
+        _timed(stages, "tab3", _tab3, totals)
+        _timed(stages, "tab4", _tab4, totals)
+
+    return {
+        "games":  n_games,
+        "bundle": bundle,
+        "files":  len(files),
+        "errors": len(errors),
+        "rows":   len(table),
+        "stages": stages
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion / agrégation sur matchs synthétiques")
+    parser.add_argument("sizes", nargs="*", type=int, default=BENCH_SIZES, help="nombres de games à générer")
+    parser.add_argument("--template", default=BENCH_TEMPLATE_DIR, help="dossier des fichiers modèles")
+    parser.add_argument("--work-dir", default=None, help="dossier temporaire des fichiers générés")
+    parser.add_argument("--bundle", default=None, choices=BUNDLE_SUFFIXES, help="regrouper les matchs en un lot de ce format")
+    parser.add_argument("--output", default=None, help="fichier JSON de sortie (stdout par défaut)")
+    args = parser.parse_args(argv)
+
+    template, champions = load_template(args.template)
+    results = []
+    for n_games in args.sizes:
+        result = run_benchmark(n_games, template, champions, args.work_dir, args.bundle)
+        results.append(result)
+        timings = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result["stages"].items())
+        print(f"{n_games} games : {timings}", file=sys.stderr)
+
+    report = {
+        "created":      datetime.now().isoformat(timespec="seconds"),
+        "python":       platform.python_version(),
+        "json_backend": JSON_BACKEND,
+        "results":      results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Lots de matchs compressés : archives zip / tar.gz et flux JSONL.
+
+Au lieu de milliers de petits fichiers 'DD_MM_YYYY_GX.json', un dossier de
+matchs peut contenir des lots, lus en flux sans extraction sur disque :
+
+    *.zip, *.tar.gz, *.tgz           un membre .json par match
+    *.jsonl, *.jsonl.gz, *.jsonl.zst un match par ligne
+
+Ce module ne fait que l'accès aux conteneurs (membres ou lignes, en octets) ;
+le nommage des matchs et le décodage JSON sont faits par ingestion.py.
+zstd nécessite le paquet optionnel `zstandard`.
+
+Usage (regrouper un dossier en un lot, à déposer ensuite à la place des
+fichiers d'origine) :
+    python bundles.py scrims_json scrims_2025.jsonl.gz
+    python bundles.py scrims_json scrims_2025.zip
+"""
+import gzip
+import io
+import json
+import os
+import sys
+import tarfile
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_SUFFIXES = (".zip", ".tar.gz", ".tgz")
+JSONL_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+BUNDLE_SUFFIXES = ARCHIVE_SUFFIXES + JSONL_SUFFIXES
+
+# Erreurs de lecture d'un lot (corrompu, tronqué, membre absent...)
+BUNDLE_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile, tarfile.TarError)
+if zstandard is not None:
+    BUNDLE_ERRORS += (zstandard.ZstdError,)
+
+
+def is_bundle(fname):
+    return fname.endswith(BUNDLE_SUFFIXES)
+
+
+def is_jsonl(fname):
+    return fname.endswith(JSONL_SUFFIXES)
+
+
+def split_member(fname):
+    """
+    Sépare le nom d'un match contenu dans un lot ('lot.zip/membre.json') en
+    (nom du lot, nom du membre). Retourne (None, fname) pour un fichier simple.
+    """
+    bundle, sep, member = fname.partition("/")
+    if sep and is_bundle(bundle):
+        return bundle, member
+    return None, fname
+
+
+def _open_stream(path):
+    """
+    Flux binaire décompressé d'un fichier JSONL.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError(f"{os.path.basename(path)} : le paquet 'zstandard' est nécessaire pour lire les flux zstd")
+        f = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, closefd=True))
+    return open(path, "rb")
+
+
+def iter_lines(path):
+    """
+    Itère sur les lignes non vides d'un flux JSONL : (numéro de ligne, octets).
+    """
+    with _open_stream(path) as stream:
+        for lineno, line in enumerate(stream, start=1):
+            line = line.strip()
+            if line:
+                yield lineno, line
+
+
+def archive_members(path):
+    """
+    Noms des membres .json d'une archive zip / tar.gz, sans les lire (la
+    liste d'un tar.gz impose tout de même de décompresser le flux).
+    """
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            return [info.filename for info in archive.infolist() if not info.is_dir() and info.filename.endswith(".json")]
+    with tarfile.open(path, "r|gz") as archive:
+        return [member.name for member in archive if member.isfile() and member.name.endswith(".json")]
+
+
+def iter_archive(path, wanted=None):
+    """
+    Itère sur les membres .json d'une archive : (nom, octets). Si `wanted`
+    est fourni, seuls ces membres sont lus (accès direct pour un zip, un
+    seul passage en flux pour un tar.gz).
+    """
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            names = wanted if wanted is not None else [
+                info.filename for info in archive.infolist()
+                if not info.is_dir() and info.filename.endswith(".json")
+            ]
+            for name in names:
+                yield name, archive.read(name)
+        return
+    with tarfile.open(path, "r|gz") as archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(".json"):
+                continue
+            if wanted is not None and member.name not in wanted:
+                continue
+            yield member.name, archive.extractfile(member).read()
+
+
+def pack_folder(folder, output):
+    """
+    Regroupe les fichiers .json d'un dossier en un lot (zip, tar.gz ou
+    JSONL selon l'extension de `output`). Dans un JSONL, le nom d'origine de
+    chaque fichier est conservé dans le champ "fname" de sa ligne.
+
+    Retourne le nombre de matchs écrits.
+    """
+    fnames = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
+    if output.endswith(".zip"):
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for fname in fnames:
+                archive.write(os.path.join(folder, fname), fname)
+    elif output.endswith((".tar.gz", ".tgz")):
+        with tarfile.open(output, "w:gz") as archive:
+            for fname in fnames:
+                archive.add(os.path.join(folder, fname), fname)
+    elif is_jsonl(output):
+        if output.endswith(".gz"):
+            stream = gzip.open(output, "wb")
+        elif output.endswith(".zst"):
+            if zstandard is None:
+                raise OSError("le paquet 'zstandard' est nécessaire pour écrire un flux zstd")
+            stream = zstandard.ZstdCompressor().stream_writer(open(output, "wb"), closefd=True)
+        else:
+            stream = open(output, "wb")
+        with stream:
+            for fname in fnames:
+                with open(os.path.join(folder, fname), "r", encoding="utf-8") as f:
+                    match_data = json.load(f)
+                match_data["fname"] = fname
+                stream.write(json.dumps(match_data, ensure_ascii=False).encode("utf-8") + b"\n")
+    else:
+        raise ValueError(f"Format de lot inconnu : {output} (attendu : {', '.join(BUNDLE_SUFFIXES)})")
+    return len(fnames)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage : python bundles.py <dossier> <lot>")
+        sys.exit(1)
+    try:
+        n = pack_folder(sys.argv[1], sys.argv[2])
+    except (OSError, ValueError) as e:
+        print(f"Échec : {e}")
+        sys.exit(1)
+    print(f"{sys.argv[2]} : {n} matchs")
@@ -0,0 +1,297 @@
+"""
+Base analytique embarquée (SQLite) des participants, pour les requêtes ad hoc.
+
+Les tables de participants déjà construites (snapshot + JSON, marquées par
+tag_rosters) sont copiées dans une base SQLite locale, indexée par date,
+équipe, joueur et champion. Une nouvelle question ("winrate côté rouge quand
+on prend un héraut") devient une requête SQL au lieu d'un nouvel
+accumulateur dans aggregates.py. La copie d'un dossier n'est refaite que
+quand son empreinte ou la configuration des rosters change.
+
+Schéma :
+    participants   une ligne par (dossier, match, participant) : colonnes de
+                   la table des participants + PLAYER et ROSTER (tag_rosters)
+    sides          côté (TEAM) de chaque roster dans chaque match
+    roster_participants
+                   vue participants × sides, avec la colonne roster et les
+                   booléens OUR_TEAM et IS_ROSTER (comme roster_view)
+    selection      (table temporaire) fichiers des matchs sélectionnés
+    selected       vue roster_participants limitée à la sélection
+
+Les requêtes reçoivent les paramètres :folder et :roster. Les statistiques
+du dashboard (équipe, joueurs, rôles, champions) y sont réécrites en SQL
+dans QUERIES, avec quelques analyses d'exemple.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from participants import CATEGORICAL_FIELDS, NUMERIC_FIELDS, ROLES
+
+DATABASE_FILE = os.path.join("snapshots", "matches.sqlite")
+
+# Durée maximale d'une requête ad hoc (secondes)
+QUERY_TIMEOUT_SECONDS = 10
+
+# Erreurs d'une requête ad hoc (SQL invalide, écriture refusée, délai
+# dépassé, requête vide ou sans résultat...)
+QUERY_ERRORS = (sqlite3.Error, ValueError)
+
+TEXT_FIELDS = ["fname", "match_id", "date", "game_version", "ROLE"] + CATEGORICAL_FIELDS + ["PLAYER", "ROSTER"]
+
+# Colonnes de la table participants : une base écrite avec d'autres colonnes
+# (champ ajouté ou retiré) est vidée et recopiée
+PARTICIPANT_COLUMNS = ["folder"] + TEXT_FIELDS + ["game", "WIN"] + list(NUMERIC_FIELDS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS folders (
+    folder  TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    folder TEXT NOT NULL,
+    {", ".join(f"{field} TEXT" for field in TEXT_FIELDS)},
+    game INTEGER,
+    WIN INTEGER NOT NULL,
+    {", ".join(f"{field} {'REAL' if dtype.startswith('float') else 'INTEGER'}" for field, dtype in NUMERIC_FIELDS.items())}
+);
+CREATE INDEX IF NOT EXISTS participants_match ON participants (folder, fname);
+CREATE INDEX IF NOT EXISTS participants_date ON participants (folder, date);
+CREATE INDEX IF NOT EXISTS participants_team ON participants (TEAM);
+CREATE INDEX IF NOT EXISTS participants_player ON participants (PLAYER);
+CREATE INDEX IF NOT EXISTS participants_champion ON participants (SKIN);
+CREATE TABLE IF NOT EXISTS sides (
+    folder TEXT NOT NULL,
+    fname  TEXT NOT NULL,
+    roster TEXT NOT NULL,
+    team   TEXT NOT NULL,
+    PRIMARY KEY (folder, roster, fname)
+);
+CREATE VIEW IF NOT EXISTS roster_participants AS
+    SELECT s.roster AS roster, p.*,
+           p.TEAM = s.team AS OUR_TEAM,
+           p.ROSTER IS s.roster AS IS_ROSTER
+    FROM sides s
+    JOIN participants p ON p.folder = s.folder AND p.fname = s.fname;
+CREATE TEMP TABLE IF NOT EXISTS selection (fname TEXT PRIMARY KEY);
+CREATE TEMP VIEW IF NOT EXISTS selected AS
+    SELECT r.* FROM roster_participants r JOIN selection USING (fname);
+"""
+
+# Filtre commun : le dossier et le roster demandés
+_SCOPE = "folder = :folder AND roster = :roster"
+
+_ROLE_ORDER = "CASE ROLE " + " ".join(f"WHEN '{role}' THEN {i}" for i, role in enumerate(ROLES)) + " END"
+
+# Requêtes prêtes à l'emploi (libellé -> SQL sur la vue `selected`)
+QUERIES = {
+    "Résumé équipe": f"""
+WITH matches AS (
+    SELECT fname, MAX(WIN) AS win,
+           SUM(DRAGON_KILLS) AS dragons, SUM(BARON_KILLS) AS barons,
+           SUM(RIFT_HERALD_KILLS) AS heralds, SUM(TURRET_TAKEDOWNS) AS towers,
+           SUM(HORDE_KILLS) AS grubs, SUM(CHAMPIONS_KILLED) AS kills,
+           SUM(NUM_DEATHS) AS deaths, SUM(TOTAL_DAMAGE_DEALT_TO_CHAMPIONS) AS damage,
+           SUM(VISION_SCORE) AS vision, SUM(VISION_WARDS_BOUGHT_IN_GAME) AS control_wards,
+           SUM(WARD_KILLED) AS wards_killed, SUM(TIME_PLAYED) / 60.0 AS minutes
+    FROM selected
+    WHERE {_SCOPE} AND OUR_TEAM
+    GROUP BY fname
+)
+SELECT COUNT(*) AS games, SUM(win) AS wins, 100.0 * AVG(win) AS win_rate,
+       AVG(dragons) AS dragons, AVG(barons) AS barons, AVG(heralds) AS heralds,
+       AVG(towers) AS towers, AVG(grubs) AS grubs, AVG(kills) AS kills, AVG(deaths) AS deaths,
+       SUM(damage) / SUM(minutes) AS damage_per_min, AVG(vision) AS vision_score,
+       SUM(vision) / SUM(minutes) AS vision_per_min, AVG(control_wards) AS control_wards,
+       AVG(wards_killed) AS wards_killed
+FROM matches
+""",
+    "Statistiques des joueurs": f"""
+WITH team AS (
+    SELECT fname, SUM(CHAMPIONS_KILLED) AS kills
+    FROM selected
+    WHERE {_SCOPE} AND OUR_TEAM
+    GROUP BY fname
+)
+SELECT PLAYER AS Joueur, COUNT(*) AS Parties,
+       1.0 * (SUM(CHAMPIONS_KILLED) + SUM(ASSISTS)) / MAX(SUM(NUM_DEATHS), 1) AS KDA,
+       AVG(CHAMPIONS_KILLED) AS "Kills/Game",
+       AVG(NUM_DEATHS) AS "Deaths/Game",
+       AVG(ASSISTS) AS "Assists/Game",
+       AVG(CASE WHEN team.kills > 0 THEN 100.0 * (CHAMPIONS_KILLED + ASSISTS) / team.kills ELSE 0 END) AS "KP (%)",
+       CASE WHEN SUM(GOLD_EARNED) > 0
+            THEN 100.0 * SUM(TOTAL_DAMAGE_DEALT_TO_CHAMPIONS) / SUM(GOLD_EARNED) ELSE 0 END AS "Gold Efficiency (%)"
+FROM selected
+LEFT JOIN team USING (fname)
+WHERE {_SCOPE} AND IS_ROSTER
+GROUP BY PLAYER
+""",
+    "Répartition par rôle": f"""
+SELECT ROLE AS "Rôle",
+       1.0 * SUM(GOLD_EARNED) / (SELECT COUNT(DISTINCT fname) FROM selected WHERE {_SCOPE}) AS Gold,
+       100.0 * SUM(GOLD_EARNED) / SUM(SUM(GOLD_EARNED)) OVER () AS "Gold (%)",
+       1.0 * SUM(TOTAL_DAMAGE_DEALT_TO_CHAMPIONS) / (SELECT COUNT(DISTINCT fname) FROM selected WHERE {_SCOPE}) AS Damage,
+       100.0 * SUM(TOTAL_DAMAGE_DEALT_TO_CHAMPIONS) / SUM(SUM(TOTAL_DAMAGE_DEALT_TO_CHAMPIONS)) OVER () AS "Damage (%)"
+FROM selected
+WHERE {_SCOPE} AND IS_ROSTER AND ROLE != ''
+GROUP BY ROLE
+ORDER BY {_ROLE_ORDER}
+""",
+    "Champions par joueur": f"""
+SELECT PLAYER, SKIN, COUNT(*) AS games, SUM(WIN) AS wins, 100.0 * AVG(WIN) AS winrate
+FROM selected
+WHERE {_SCOPE} AND IS_ROSTER
+GROUP BY PLAYER, SKIN
+ORDER BY games DESC, winrate DESC
+""",
+    "Winrate par côté quand on prend un héraut": f"""
+WITH matches AS (
+    SELECT fname, TEAM, MAX(WIN) AS win, SUM(RIFT_HERALD_KILLS) AS heralds
+    FROM selected
+    WHERE {_SCOPE} AND OUR_TEAM
+    GROUP BY fname, TEAM
+)
+SELECT CASE TEAM WHEN '100' THEN 'Bleu' WHEN '200' THEN 'Rouge' ELSE TEAM END AS "Côté",
+       COUNT(*) AS Games, 100.0 * AVG(win) AS Winrate
+FROM matches
+WHERE heralds > 0
+GROUP BY TEAM
+""",
+    "Part du gold du JUNGLE (victoires / défaites)": f"""
+WITH matches AS (
+    SELECT fname, MAX(WIN) AS win, SUM(GOLD_EARNED) AS gold,
+           SUM(CASE WHEN ROLE = 'JUNGLE' THEN GOLD_EARNED ELSE 0 END) AS jungle_gold
+    FROM selected
+    WHERE {_SCOPE} AND OUR_TEAM
+    GROUP BY fname
+)
+SELECT CASE win WHEN 1 THEN 'Victoires' ELSE 'Défaites' END AS "Résultat",
+       COUNT(*) AS Games, 100.0 * SUM(jungle_gold) / SUM(gold) AS "Gold JUNGLE (%)"
+FROM matches
+GROUP BY win
+""",
+}
+
+# Actions autorisées pendant une requête ad hoc : lecture seule
+_READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+
+def _read_only(action, *args):
+    return sqlite3.SQLITE_OK if action in _READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def folder_version(fingerprint, roster_key):
+    """
+    Version d'un dossier dans la base : empreinte du dossier + configuration
+    des rosters.
+    """
+    return hashlib.sha1(repr((fingerprint, roster_key)).encode("utf-8")).hexdigest()
+
+
+class MatchDatabase:
+    """
+    Connexion SQLite partagée (une seule, protégée par un verrou : la
+    sélection est une table temporaire de la connexion).
+    """
+
+    def __init__(self, path=DATABASE_FILE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(participants)")]
+            if columns and columns != PARTICIPANT_COLUMNS:
+                self._conn.executescript(
+                    "DROP VIEW IF EXISTS roster_participants; DROP TABLE IF EXISTS participants; "
+                    "DROP TABLE IF EXISTS sides; DROP TABLE IF EXISTS folders;"
+                )
+            self._conn.executescript(SCHEMA)
+
+    def sync(self, folder, fingerprint, roster_key, table, sides):
+        """
+        Copie dans la base la table des participants d'un dossier (passée par
+        tag_rosters) et le côté de chaque roster, si sa version a changé.
+        Retourne True si le dossier a été rechargé.
+        """
+        version = folder_version(fingerprint, roster_key)
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM folders WHERE folder = ?", (folder,)).fetchone()
+            if row is not None and row[0] == version:
+                return False
+
+            rows = table[["fname", "match_id", "date", "game", "game_version", "ROLE", "WIN"]
+                         + CATEGORICAL_FIELDS + ["PLAYER", "ROSTER"] + list(NUMERIC_FIELDS)].copy()
+            for field in TEXT_FIELDS:
+                if field == "date":
+                    rows[field] = rows[field].dt.strftime("%Y-%m-%d")
+                rows[field] = rows[field].astype(object).where(rows[field].notna(), None)
+            rows["game"] = rows["game"].astype(object).where(rows["game"].notna(), None)
+            rows["WIN"] = rows["WIN"].astype(int)
+            rows.insert(0, "folder", folder)
+
+            # Côtés : (match, ROSTER) -> code TEAM, traduit en valeur de TEAM
+            fname_of = table.groupby("match")["fname"].first().astype(str)
+            side_rows = [
+                (folder, fname_of[match], roster, str(table["TEAM"].cat.categories[code]))
+                for (match, roster), code in sides.items()
+            ]
+
+            with self._conn:
+                self._conn.execute("DELETE FROM participants WHERE folder = ?", (folder,))
+                self._conn.execute("DELETE FROM sides WHERE folder = ?", (folder,))
+                rows.to_sql("participants", self._conn, if_exists="append", index=False, chunksize=10000)
+                self._conn.executemany("INSERT INTO sides VALUES (?, ?, ?, ?)", side_rows)
+                self._conn.execute("INSERT OR REPLACE INTO folders VALUES (?, ?)", (folder, version))
+        return True
+
+    def query(self, sql, folder, roster, fnames=None, read_only=True):
+        """
+        Exécute une requête sur les matchs `fnames` du dossier (tous si None)
+        pour le roster `roster` et retourne un DataFrame. En lecture seule
+        (requêtes ad hoc), toute écriture est refusée et la requête est
+        interrompue après QUERY_TIMEOUT_SECONDS.
+
+        Lève une des QUERY_ERRORS si la requête échoue ou ne retourne pas de
+        résultat (requête vide, commentaires seuls...).
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM selection")
+            if fnames is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO selection SELECT DISTINCT fname FROM participants WHERE folder = ?",
+                    (folder,)
+                )
+            else:
+                self._conn.executemany("INSERT OR IGNORE INTO selection VALUES (?)", ((f,) for f in fnames))
+
+            if read_only:
+                deadline = time.monotonic() + QUERY_TIMEOUT_SECONDS
+                self._conn.set_authorizer(_read_only)
+                self._conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+            try:
+                cursor = self._conn.execute(sql, {"folder": folder, "roster": roster})
+                if cursor.description is None:
+                    raise ValueError("la requête ne retourne aucun résultat (requête vide ?)")
+                columns = [column[0] for column in cursor.description]
+                return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+            finally:
+                if read_only:
+                    self._conn.set_authorizer(None)
+                    self._conn.set_progress_handler(None, 0)
+
+    def columns(self):
+        """
+        {table ou vue: [colonnes]} du schéma interrogeable.
+        """
+        names = ["participants", "sides", "roster_participants", "selected"]
+        with self._lock:
+            return {
+                name: [row[1] for row in self._conn.execute(f"PRAGMA table_info({name})")]
+                for name in names
+            }
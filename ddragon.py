@@ -0,0 +1,203 @@
+"""
+Métadonnées Data Dragon : résolution de version et index des champions.
+
+Le nom de champion stocké dans les matchs (SKIN) ne correspond pas toujours à
+l'identifiant DDragon utilisé dans les URLs d'icônes (ex : 'Wukong' /
+'MonkeyKing', 'K'Sante' / 'KSante'). On construit une fois, par version, un
+index nom -> (id DDragon, nom affiché) depuis un snapshot local de
+champion.json, téléchargé au besoin.
+
+Usage (pré-télécharger un snapshot) :
+    python ddragon.py 15.1.1
+"""
+import json
+import os
+import re
+import sys
+import threading
+
+import requests
+
+DDRAGON_BASE_URL = "https://ddragon.leagueoflegends.com"
+DDRAGON_VERSION = "15.1.1"  # Version utilisée si gameVersion est inexploitable
+DDRAGON_DATA_DIR = "ddragon"
+DDRAGON_LOCALE = "fr_FR"
+
+# Identifiants DDragon qui ne se déduisent pas du nom affiché
+KNOWN_IDS = {
+    "wukong": "MonkeyKing",
+    "nunuwillump": "Nunu",
+    "renataglasc": "Renata",
+    "leblanc": "Leblanc",
+    "chogath": "Chogath",
+    "kaisa": "Kaisa",
+    "khazix": "Khazix",
+    "velkoz": "Velkoz",
+    "belveth": "Belveth",
+}
+
+_GAME_VERSION_PATTERN = re.compile(r'^(\d+)\.(\d+)')
+
+
+def _normalize(name):
+    """
+    Clé de recherche insensible à la casse, aux espaces et à la ponctuation.
+    """
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def _version_tuple(version):
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
+
+def local_versions(data_dir=DDRAGON_DATA_DIR):
+    """
+    Versions pour lesquelles un snapshot champion.json existe localement.
+    """
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(
+        (
+            version for version in os.listdir(data_dir)
+            if os.path.exists(os.path.join(data_dir, version, "champion.json"))
+        ),
+        key=_version_tuple
+    )
+
+
+def patch_of(game_version):
+    """
+    Patch 'X.Y' d'un gameVersion ('15.1.649.4112' -> '15.1'), ou "" si illisible.
+    """
+    match = _GAME_VERSION_PATTERN.match(str(game_version or "").strip())
+    if not match:
+        return ""
+    return f"{int(match.group(1))}.{int(match.group(2))}"
+
+
+def ddragon_version_for(game_version, available=None):
+    """
+    Résout la version DDragon d'un match à partir de son gameVersion
+    (ex : '15.1.649.4112' -> '15.1.1').
+
+    Parmi les snapshots locaux `available`, on prend le plus récent du même
+    patch ; sinon on suppose la première release DDragon du patch ('X.Y.1').
+    """
+    patch = patch_of(game_version)
+    if not patch:
+        return DDRAGON_VERSION
+    patch = _version_tuple(patch)
+
+    same_patch = [v for v in (available or []) if _version_tuple(v)[:2] == patch]
+    if same_patch:
+        return max(same_patch, key=_version_tuple)
+    return f"{patch[0]}.{patch[1]}.1"
+
+
+class ChampionIndex:
+    """
+    Index nom de champion -> (id DDragon, nom affiché) pour une version.
+
+    Sans snapshot (index vide), on retombe sur une déduction depuis le nom :
+    suppression des espaces / apostrophes / points en gardant la casse.
+    """
+
+    def __init__(self, champion_json=None):
+        self._by_key = {}
+        champions = (champion_json or {}).get("data", {})
+        for champ in champions.values():
+            entry = (champ["id"], champ.get("name", champ["id"]))
+            self._by_key[_normalize(champ["id"])] = entry
+            self._by_key[_normalize(entry[1])] = entry
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def _lookup(self, champion_name):
+        return self._by_key.get(_normalize(champion_name))
+
+    def ddragon_id(self, champion_name):
+        entry = self._lookup(champion_name)
+        if entry is not None:
+            return entry[0]
+        known = KNOWN_IDS.get(_normalize(champion_name))
+        if known is not None:
+            return known
+        formatted = re.sub(r"[ '.&]", "", champion_name)
+        return formatted[:1].upper() + formatted[1:]
+
+    def display_name(self, champion_name):
+        entry = self._lookup(champion_name)
+        return entry[1] if entry is not None else champion_name
+
+
+def champion_json_path(version, data_dir=DDRAGON_DATA_DIR):
+    return os.path.join(data_dir, version, "champion.json")
+
+
+def download_champion_json(version, data_dir=DDRAGON_DATA_DIR, session=None,
+                           base_url=DDRAGON_BASE_URL, timeout=5):
+    """
+    Télécharge le champion.json d'une version dans le snapshot local.
+    Retourne le JSON, ou None en cas d'échec.
+    """
+    url = f"{base_url}/cdn/{version}/data/{DDRAGON_LOCALE}/champion.json"
+    try:
+        response = (session or requests).get(url, timeout=timeout)
+        response.raise_for_status()
+        champion_json = response.json()
+    except (requests.RequestException, ValueError):
+        return None
+
+    path = champion_json_path(version, data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(champion_json, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    return champion_json
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def load_champion_index(version, data_dir=DDRAGON_DATA_DIR, session=None,
+                        base_url=DDRAGON_BASE_URL, download=True):
+    """
+    Retourne l'index des champions d'une version, construit une seule fois
+    par processus. Le snapshot local est utilisé s'il existe, sinon il est
+    téléchargé (si download) ; à défaut l'index est vide (déduction du nom).
+    """
+    key = (version, os.path.abspath(data_dir))
+    with _indexes_lock:
+        if key in _indexes:
+            return _indexes[key]
+
+    champion_json = None
+    try:
+        with open(champion_json_path(version, data_dir), "r", encoding="utf-8") as f:
+            champion_json = json.load(f)
+    except (OSError, ValueError):
+        if download:
+            champion_json = download_champion_json(version, data_dir, session, base_url)
+
+    index = ChampionIndex(champion_json)
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
+
+
+def forget_champion_indexes():
+    """
+    Vide les index en mémoire (ex : après l'ajout d'un snapshot local).
+    """
+    with _indexes_lock:
+        _indexes.clear()
+
+
+if __name__ == "__main__":
+    for version in sys.argv[1:] or [DDRAGON_VERSION]:
+        if download_champion_json(version) is None:
+            print(f"{version} : échec du téléchargement")
+        else:
+            print(f"{version} : {champion_json_path(version)}")
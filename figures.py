@@ -0,0 +1,170 @@
+"""
+Figures Plotly du dashboard, mises en cache.
+
+Chaque constructeur prend des valeurs hashables (tuples de nombres, chaînes)
+et est mémoïsé : tant que les statistiques affichées ne changent pas, le
+même objet Figure est réutilisé tel quel d'un rerun à l'autre. Les figures
+retournées sont partagées et ne doivent pas être modifiées.
+
+Les figures utilisent un template minimal au lieu du template Plotly par
+défaut (~6 Ko de JSON sérialisés avec chaque figure, puis remplacés côté
+navigateur par le thème Streamlit). Les anneaux de référence des radars
+(25 / 50 / 75 / 100 %) sont la grille polygonale du template RADAR_TEMPLATE,
+au lieu de quatre traces par graphique.
+"""
+from functools import lru_cache
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from instrumentation import profiled
+
+FIGURE_CACHE_SIZE = 256
+
+# Template partagé minimal (le style vient du thème Streamlit)
+BASE_TEMPLATE = go.layout.Template()
+
+GRID_COLOR = "rgba(255,255,255,0.1)"
+
+RADAR_TEMPLATE = go.layout.Template(layout=dict(
+    polar=dict(
+        gridshape="linear",
+        radialaxis=dict(
+            visible=True,
+            range=[0, 100],
+            tickvals=[25, 50, 75, 100],
+            showticklabels=False,
+            gridcolor=GRID_COLOR
+        ),
+        angularaxis=dict(
+            gridcolor=GRID_COLOR,
+            rotation=90,  # Rotation pour une meilleure lisibilité
+            direction="clockwise"
+        ),
+        bgcolor="rgba(0,0,0,0)"
+    ),
+    showlegend=False,
+    paper_bgcolor="rgba(0,0,0,0)",
+    margin=dict(t=100, b=100),  # Plus d'espace en haut et en bas
+    height=400  # Hauteur fixe pour tous les graphiques
+))
+
+# Plages de valeurs de chaque métrique du radar joueur
+RADAR_METRIC_RANGES = {
+    "Kill Participation": {"min": 0, "max": 100, "good": 60},
+    "Efficiency":         {"min": 0, "max": 150, "good": 100},
+    "KDA":                {"min": 0, "max": 5, "good": 3},
+    "Assists/Game":       {"min": 0, "max": 15, "good": 8},
+    "Kills/Game":         {"min": 0, "max": 10, "good": 5}
+}
+
+# Ordre spécifique des métriques pour une meilleure lisibilité
+RADAR_METRICS = ["Kill Participation", "Efficiency", "KDA", "Assists/Game", "Kills/Game"]
+
+
+def _normalize(value, metric_range):
+    min_val = metric_range["min"]
+    max_val = metric_range["max"]
+    return min(max(value, min_val), max_val) / max_val * 100
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+@profiled("construction des figures")
+def winrate_gauge(win_rate):
+    """
+    Jauge du win rate (en %).
+    """
+    return go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=win_rate,
+            domain={"x": [0, 1], "y": [0, 1]},
+            title={"text": "Win Rate"},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {"color": "#1E88E5"},
+                "steps": [
+                    {"range": [0, 40], "color": "#FF4B4B"},
+                    {"range": [40, 60], "color": "#FFA726"},
+                    {"range": [60, 100], "color": "#66BB6A"}
+                ]
+            }
+        ),
+        layout=dict(template=BASE_TEMPLATE)
+    )
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+@profiled("construction des figures")
+def player_radar(player_name, values):
+    """
+    Radar du profil d'un joueur. values : valeurs réelles des RADAR_METRICS,
+    dans l'ordre, normalisées ici selon RADAR_METRIC_RANGES.
+    """
+    normalized = [_normalize(value, RADAR_METRIC_RANGES[metric]) for metric, value in zip(RADAR_METRICS, values)]
+    return go.Figure(
+        go.Scatterpolar(
+            r=normalized,
+            theta=RADAR_METRICS,
+            fill="toself",
+            name=player_name,
+            fillcolor="rgba(29, 185, 84, 0.3)",  # Vert Spotify semi-transparent
+            line=dict(color="#1DB954"),  # Vert Spotify
+            text=[f"{value:.1f}" for value in values],  # Valeurs réelles
+            hovertemplate="%{theta}: %{text}<br>Score: %{r:.1f}%<extra></extra>"
+        ),
+        layout=dict(
+            template=RADAR_TEMPLATE,
+            title=dict(text=player_name, font=dict(size=20, color="white"), y=0.95)
+        )
+    )
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+@profiled("construction des figures")
+def comparison_radar(players, categories, values):
+    """
+    Radar comparatif (onglet Tournoi) : une trace par joueur, chaque
+    catégorie normalisée par son maximum (0 si toute la colonne est nulle,
+    ex. aucune balise de contrôle). values : un tuple de valeurs par
+    joueur, dans l'ordre de `categories`.
+    """
+    max_values = [max(column) for column in zip(*values)]
+    fig = go.Figure(layout=dict(
+        template=BASE_TEMPLATE,
+        polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
+        showlegend=True,
+        title="Comparaison des performances par joueur"
+    ))
+    for player, player_values in zip(players, values):
+        fig.add_trace(go.Scatterpolar(
+            r=[val / max_val if max_val else 0.0 for val, max_val in zip(player_values, max_values)],
+            theta=list(categories),
+            fill="toself",
+            name=player
+        ))
+    return fig
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+@profiled("construction des figures")
+def role_pie(roles, values, title, colors):
+    """
+    Camembert de la répartition d'une ressource par rôle.
+    """
+    return px.pie(
+        names=list(roles),
+        values=list(values),
+        title=title,
+        color_discrete_sequence=list(colors),
+        template=BASE_TEMPLATE
+    )
+
+
+def cache_stats():
+    """
+    Compteurs cumulés des caches de figures (hits / misses, tous
+    constructeurs confondus).
+    """
+    infos = [builder.cache_info() for builder in (winrate_gauge, player_radar, comparison_radar, role_pie)]
+    return {"hits": sum(info.hits for info in infos), "misses": sum(info.misses for info in infos)}
@@ -0,0 +1,221 @@
+"""
+Cache local des icônes de champions (Data Dragon).
+
+Les noms de fichiers DDragon sont résolus via l'index de champions de la
+version (voir ddragon.py). Chaque PNG (version, champion) est téléchargé au
+plus une fois, écrit
+dans un dossier de cache local puis servi depuis la mémoire / le disque. Les
+icônes nécessaires à un rendu sont préchargées en parallèle avec une session
+HTTP partagée, avant de dessiner la grille.
+
+Pour l'affichage, les icônes sont réduites une fois pour toutes en vignettes
+(60 px par défaut) stockées à côté des originaux et servies en data URI :
+chaque carte devient une simple recherche, sans décodage Pillow ni
+ré-encodage par Streamlit.
+"""
+import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from ddragon import (
+    DDRAGON_BASE_URL, DDRAGON_DATA_DIR, DDRAGON_VERSION,
+    forget_champion_indexes, load_champion_index
+)
+
+ICON_CACHE_DIR = "icon_cache"
+THUMBNAIL_SIZE = 60
+
+
+def get_champion_icon_url(ddragon_id, ddragon_version=DDRAGON_VERSION, base_url=DDRAGON_BASE_URL):
+    """
+    Retourne l'URL de l'icône pour un identifiant DDragon (ex: 'MonkeyKing').
+    """
+    return f"{base_url}/cdn/{ddragon_version}/img/champion/{ddragon_id}.png"
+
+
+def _write_atomic(path, content):
+    """
+    Écriture atomique : un rendu concurrent ne lit jamais un PNG tronqué.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _resize_png(content, size):
+    """
+    Réduit une image en vignette PNG size×size.
+    """
+    with Image.open(BytesIO(content)) as img:
+        thumbnail = img.convert("RGBA").resize((size, size), Image.LANCZOS)
+    out = BytesIO()
+    thumbnail.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+class IconStore:
+    """
+    Icônes de champions avec trois niveaux : mémoire, disque, réseau.
+
+    Un échec de téléchargement est mémorisé pour ne pas être retenté à chaque
+    rerun ; get() retourne alors None et l'appelant affiche un texte.
+    """
+
+    def __init__(self, cache_dir=ICON_CACHE_DIR, base_url=DDRAGON_BASE_URL,
+                 timeout=5, max_workers=8, data_dir=DDRAGON_DATA_DIR):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.data_dir = data_dir
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._memory = {}     # (version, champion) -> bytes
+        self._failed = set()  # (version, champion) introuvables
+        self._data_uris = {}  # (version, champion, size) -> data URI
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_reads": 0, "downloads": 0, "failures": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def champion_index(self, version):
+        """
+        Index des champions de la version (snapshot local ou téléchargé).
+        """
+        return load_champion_index(version, self.data_dir, self.session, self.base_url)
+
+    def path_for(self, version, champion, size=None):
+        folder = os.path.join(self.cache_dir, version)
+        if size is not None:
+            folder = os.path.join(folder, f"{size}px")
+        ddragon_id = self.champion_index(version).ddragon_id(champion)
+        return os.path.join(folder, f"{ddragon_id}.png")
+
+    def get(self, version, champion):
+        """
+        Retourne les octets PNG de l'icône, ou None si elle est introuvable.
+        """
+        key = (version, champion)
+        with self._lock:
+            if key in self._memory:
+                self.counters["memory_hits"] += 1
+                return self._memory[key]
+            if key in self._failed:
+                return None
+
+        path = self.path_for(version, champion)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            source = "disk_reads"
+        except OSError:
+            content = self._download(version, champion, path)
+            source = "downloads"
+
+        with self._lock:
+            self.counters[source] += 1
+            if content is None:
+                self._failed.add(key)
+                self.counters["failures"] += 1
+            else:
+                self._memory[key] = content
+        return content
+
+    def _download(self, version, champion, path):
+        ddragon_id = self.champion_index(version).ddragon_id(champion)
+        url = get_champion_icon_url(ddragon_id, version, self.base_url)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200 or not response.content:
+            return None
+
+        _write_atomic(path, response.content)
+        return response.content
+
+    def thumbnail_data_uri(self, version, champion, size=THUMBNAIL_SIZE):
+        """
+        Retourne la vignette size×size de l'icône en data URI PNG, ou None si
+        l'icône est introuvable. La vignette est calculée une seule fois puis
+        relue depuis le disque.
+        """
+        key = (version, champion, size)
+        with self._lock:
+            if key in self._data_uris:
+                self.counters["memory_hits"] += 1
+                return self._data_uris[key]
+
+        path = self.path_for(version, champion, size)
+        try:
+            with open(path, "rb") as f:
+                thumbnail = f.read()
+            with self._lock:
+                self.counters["disk_reads"] += 1
+        except OSError:
+            original = self.get(version, champion)
+            if original is None:
+                return None
+            try:
+                thumbnail = _resize_png(original, size)
+            except (OSError, ValueError):
+                return None
+            _write_atomic(path, thumbnail)
+
+        data_uri = "data:image/png;base64," + base64.b64encode(thumbnail).decode("ascii")
+        with self._lock:
+            self._data_uris[key] = data_uri
+        return data_uri
+
+    def prefetch(self, version, champions, size=None):
+        """
+        Charge en parallèle toutes les icônes demandées (disque ou réseau),
+        et prépare leurs vignettes si `size` est fourni.
+        """
+        champions = set(champions)
+        # L'index est construit (et le snapshot éventuellement téléchargé) avant de paralléliser
+        self.champion_index(version)
+        with self._lock:
+            if size is None:
+                todo = [
+                    champ for champ in champions
+                    if (version, champ) not in self._memory and (version, champ) not in self._failed
+                ]
+            else:
+                todo = [
+                    champ for champ in champions
+                    if (version, champ, size) not in self._data_uris and (version, champ) not in self._failed
+                ]
+        if not todo:
+            return
+        if size is None:
+            load = lambda champ: self.get(version, champ)
+        else:
+            load = lambda champ: self.thumbnail_data_uri(version, champ, size)
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            list(pool.map(load, todo))
+
+    def stats(self):
+        """
+        Compteurs cumulés : accès servis depuis la mémoire, fichiers lus sur
+        le disque, téléchargements et échecs.
+        """
+        with self._lock:
+            return dict(self.counters)
+
+    def clear_failures(self):
+        """
+        Oublie les échecs mémorisés (ex : DDragon était momentanément indisponible).
+        """
+        forget_champion_indexes()
+        with self._lock:
+            self._failed.clear()
@@ -0,0 +1,478 @@
+"""
+Couche d'ingestion des fichiers de match (scrims et tournoi).
+
+Chaque fichier est lu et décodé une seule fois : le résultat est conservé dans
+un cache process-wide, indexé par chemin + mtime + taille. Lors d'un rerun
+Streamlit, seuls les fichiers nouveaux ou modifiés sont relus.
+
+Les fichiers manquants sont lus en parallèle (pool de threads pour les I/O,
+pool de processus optionnel pour le décodage) avec le décodeur JSON le plus
+rapide disponible : orjson, puis msgspec, puis le module json standard.
+
+Si une liste de champs est fournie (projection), seuls ces champs sont gardés
+pour chaque participant. Avec msgspec, les autres champs sont sautés pendant
+le décodage sans jamais créer d'objets Python ; sinon ils sont jetés juste
+après le décodage pour ne pas rester en mémoire dans le cache.
+
+Un dossier peut aussi contenir des lots (zip / tar.gz, JSONL compressé ou
+non, voir bundles.py). Chaque match d'un lot est un fichier virtuel
+'lot.zip/DD_MM_YYYY_GX.json' dont la signature est celle du lot : le reste
+du pipeline (snapshot, partiels, index) le traite comme un fichier. Dans un
+JSONL, le nom d'un match vient du champ "fname" de sa ligne, sinon de ses
+champs "date" et "game" (voir jsonl_entry_name).
+"""
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
+from typing import Any
+
+from bundles import (
+    BUNDLE_ERRORS, archive_members, is_bundle, is_jsonl, iter_archive, iter_lines, split_member
+)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    if msgspec is not None:
+        _json_loads = msgspec.json.decode
+        JSON_BACKEND = "msgspec"
+    else:
+        _json_loads = json.loads
+        JSON_BACKEND = "json"
+
+# Champs de premier niveau conservés par la projection
+MATCH_FIELDS = ("matchId", "gameDuration", "gameVersion")
+
+# Nombre de threads de lecture et de processus de décodage par défaut
+IO_WORKERS = min(8, os.cpu_count() or 1)
+DECODE_PROCESSES = 0
+# En dessous de ce nombre de fichiers, un pool de processus coûte plus qu'il ne rapporte
+PROCESS_POOL_MIN_FILES = 64
+
+FILENAME_PATTERN = re.compile(r'^(\d{2})_(\d{2})_(\d{4})_G(\d+)\.json$')
+
+# Champs de métadonnées lus sur chaque ligne d'un flux JSONL pour nommer le match
+JSONL_META_FIELDS = ("fname", "date", "game", "matchId")
+
+# Nombre de lots dont la liste des matchs est gardée en mémoire
+BUNDLE_INDEX_CACHE_SIZE = 256
+
+
+def parse_date_from_filename(filename):
+    """
+    Extrait la date depuis un nom de fichier au format 'DD_MM_YYYY_GX.json'
+    (pour un match d'un lot, le nom du membre). Retourne un objet datetime ou
+    None si le nom ne correspond pas.
+    """
+    match = FILENAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    day   = int(match.group(1))
+    month = int(match.group(2))
+    year  = int(match.group(3))
+    return datetime(year, month, day)
+
+
+def parse_game_number(filename):
+    """
+    Extrait le numéro de game ('GX') d'un nom 'DD_MM_YYYY_GX.json'.
+    Retourne un int ou None si le nom ne correspond pas.
+    """
+    match = FILENAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    return int(match.group(4))
+
+
+def project_match(data, fields):
+    """
+    Ne garde d'un match décodé que MATCH_FIELDS et, pour chaque participant,
+    les champs de `fields`.
+    """
+    projected = {key: data[key] for key in MATCH_FIELDS if key in data}
+    projected["participants"] = [
+        {field: p[field] for field in fields if field in p}
+        for p in data.get("participants") or []
+    ]
+    return projected
+
+
+@lru_cache(maxsize=None)
+def _projection_decoder(fields):
+    """
+    Décodeur msgspec typé qui ne matérialise que `fields` par participant.
+    """
+    participant = msgspec.defstruct(
+        "Participant", [(field, Any, None) for field in fields], omit_defaults=True
+    )
+    match = msgspec.defstruct(
+        "Match",
+        [(key, Any, None) for key in MATCH_FIELDS] + [("participants", list[participant], [])],
+        omit_defaults=True
+    )
+    decoder = msgspec.json.Decoder(match)
+    return lambda raw: msgspec.to_builtins(decoder.decode(raw))
+
+
+def decode_json(raw, fields=None):
+    """
+    Décode un document JSON (bytes) avec le backend le plus rapide disponible,
+    en ne gardant que `fields` par participant si fourni.
+    """
+    if fields is None:
+        return _json_loads(raw)
+    if msgspec is not None:
+        return _projection_decoder(tuple(fields))(raw)
+    return project_match(_json_loads(raw), fields)
+
+
+@lru_cache(maxsize=None)
+def _meta_decoder():
+    """
+    Décodeur msgspec qui ne lit que JSONL_META_FIELDS d'une ligne.
+    """
+    meta = msgspec.defstruct("Meta", [(field, Any, None) for field in JSONL_META_FIELDS])
+    decoder = msgspec.json.Decoder(meta)
+    return lambda raw: msgspec.structs.asdict(decoder.decode(raw))
+
+
+def _parse_date_field(value):
+    """
+    Date d'un champ "date" embarqué : ISO ('2025-01-14...') ou 'DD_MM_YYYY'.
+    """
+    if not isinstance(value, str):
+        return None
+    for parse in (lambda v: datetime.fromisoformat(v[:10]), lambda v: datetime.strptime(v[:10], "%d_%m_%Y")):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    return None
+
+
+def jsonl_entry_name(raw, lineno):
+    """
+    Nom du match d'une ligne JSONL : son champ "fname", sinon
+    'DD_MM_YYYY_GX.json' depuis ses champs "date" et "game", sinon son
+    matchId ou son numéro de ligne.
+    """
+    try:
+        meta = _meta_decoder()(raw) if msgspec is not None else _json_loads(raw)
+    except ValueError:
+        meta = None
+    if not isinstance(meta, dict):
+        # Ligne illisible : le décodage complet signalera l'erreur
+        return f"ligne_{lineno}.json"
+
+    if meta.get("fname"):
+        return os.path.basename(str(meta["fname"]))
+    date = _parse_date_field(meta.get("date"))
+    if date is not None and str(meta.get("game") or "").isdigit():
+        return f"{date:%d_%m_%Y}_G{int(meta['game'])}.json"
+    return f"{meta.get('matchId') or f'ligne_{lineno}'}.json"
+
+
+@lru_cache(maxsize=BUNDLE_INDEX_CACHE_SIZE)
+def bundle_index(path, signature):
+    """
+    Matchs d'un lot : {nom du match: clé dans le lot} (nom du membre d'une
+    archive, numéro de ligne d'un JSONL). Calculé une fois par version du
+    lot (signature), à ne pas modifier. Pour un JSONL, seuls les champs de
+    nommage de chaque ligne sont décodés ; à noms égaux, la première ligne
+    l'emporte.
+    """
+    if is_jsonl(path):
+        index = {}
+        for lineno, raw in iter_lines(path):
+            index.setdefault(jsonl_entry_name(raw, lineno), lineno)
+        return index
+    return {member: member for member in archive_members(path)}
+
+
+def read_bundle(path, signature, names, fields=None):
+    """
+    Lit en un seul passage les matchs `names` d'un lot. Retourne
+    ({nom: JSON décodé ou exception}, octets décompressés lus) ; si le lot
+    lui-même est illisible, chaque nom reçoit l'exception.
+    """
+    results = {}
+    n_bytes = 0
+    try:
+        index = bundle_index(path, signature)
+        wanted = {index[name]: name for name in names if name in index}
+        members = iter_lines(path) if is_jsonl(path) else iter_archive(path, list(wanted))
+        for key, raw in members:
+            if key in wanted:
+                n_bytes += len(raw)
+                results[wanted[key]] = _safe(decode_json, raw, fields)
+    except BUNDLE_ERRORS as e:
+        return {name: results.get(name, e) for name in names}, n_bytes
+    return {name: results.get(name, KeyError(f"{name} absent du lot")) for name in names}, n_bytes
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_match_file(path, fields=None):
+    """
+    Lit et décode un fichier de match JSON (voir decode_json pour `fields`).
+    """
+    return decode_json(read_bytes(path), fields)
+
+
+def _safe(func, *args):
+    """
+    Appelle func(*args) et retourne l'exception au lieu de la lever, pour qu'un
+    fichier illisible n'interrompe pas tout un lot parallèle.
+    """
+    try:
+        return func(*args)
+    except (OSError, ValueError) as e:
+        return e
+
+
+def _bundle_error(path, signature):
+    """
+    Erreur d'un lot resté illisible depuis le scan (listé sous son propre nom).
+    """
+    try:
+        bundle_index(path, signature)
+    except BUNDLE_ERRORS as e:
+        return e
+    return ValueError("lot relisible depuis le scan, il sera développé au prochain scan")
+
+
+def _safe_read_match_file(path, fields=None):
+    return _safe(read_match_file, path, fields)
+
+
+def _safe_read_bytes(path):
+    return _safe(read_bytes, path)
+
+
+def _safe_decode_json(raw, fields=None):
+    if isinstance(raw, Exception):
+        return raw
+    return _safe(decode_json, raw, fields)
+
+
+def scan_folder(folder, require_date=True):
+    """
+    Liste les fichiers de match d'un dossier avec leur signature, sans les lire.
+
+    Si require_date est vrai, les fichiers qui ne respectent pas le format
+    'DD_MM_YYYY_GX.json' sont ignorés (comportement de l'onglet Scrims).
+
+    Les lots sont développés en un fichier virtuel 'lot/match' par match,
+    avec la signature du lot (liste mise en cache par version du lot). Un lot
+    illisible est listé sous son propre nom, pour que son erreur soit
+    remontée au chargement.
+
+    Retourne un dict {fname: (mtime_ns, taille)}.
+    """
+    files = {}
+    with os.scandir(folder) as it:
+        for dir_entry in it:
+            fname = dir_entry.name
+            if is_bundle(fname) and dir_entry.is_file():
+                st = dir_entry.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+                try:
+                    names = bundle_index(dir_entry.path, signature)
+                except BUNDLE_ERRORS:
+                    files[fname] = signature
+                    continue
+                for name in names:
+                    if not require_date or parse_date_from_filename(name) is not None:
+                        files[f"{fname}/{name}"] = signature
+                continue
+            if not fname.endswith(".json") or not dir_entry.is_file():
+                continue
+            if require_date and parse_date_from_filename(fname) is None:
+                continue
+            st = dir_entry.stat()
+            files[fname] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def folder_fingerprint(files):
+    """
+    Empreinte hashable d'un dossier scanné (noms + signatures), utilisée comme
+    clé des caches de tables dérivées.
+    """
+    return tuple(sorted(files.items()))
+
+
+class MatchCache:
+    """
+    Cache des matchs décodés, partagé par tous les onglets.
+
+    Les entrées sont des dicts :
+        {"path", "signature", "fname", "date", "game", "data"}
+    où "data" est le contenu JSON du match, projeté sur `fields` si fourni.
+    """
+
+    def __init__(self, io_workers=IO_WORKERS, decode_processes=DECODE_PROCESSES, fields=None):
+        self.io_workers = io_workers
+        self.decode_processes = decode_processes
+        self.fields = tuple(fields) if fields is not None else None
+        self._entries = {}  # path -> (signature, entry)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    def load_files(self, folder, files):
+        """
+        Charge une sélection de fichiers d'un dossier en réutilisant le cache.
+
+        files : dict {fname: signature}, tel que retourné par scan_folder.
+
+        Retourne (entries, errors) : la liste des matchs triée par date, numéro
+        de game puis nom de fichier, et la liste des (fname, exception) des
+        fichiers illisibles.
+        """
+        entries = []
+        errors = []
+        missing = []
+
+        with self._lock:
+            for fname, signature in files.items():
+                path = os.path.join(folder, fname)
+                cached = self._entries.get(path)
+                if cached is not None and cached[0] == signature:
+                    self.hits += 1
+                    entries.append(cached[1])
+                else:
+                    missing.append((fname, path, signature))
+
+        # Fichiers simples d'un côté, matchs regroupés par lot de l'autre
+        plain, bundled = [], {}
+        for item in missing:
+            fname, _, signature = item
+            bundle, member = split_member(fname)
+            if bundle is None and not is_bundle(fname):
+                plain.append(item)
+            else:
+                bundled.setdefault((bundle or fname, signature), []).append((member if bundle else None, item))
+
+        results = list(zip(plain, self._read_many([path for _, path, _ in plain])))
+        results += self._read_bundles(folder, bundled)
+        n_bytes = 0
+        for (fname, path, signature), data in results:
+            if isinstance(data, Exception):
+                errors.append((fname, data))
+                continue
+            entries.append(self._store(path, fname, signature, data))
+            if split_member(fname)[0] is None:
+                n_bytes += signature[1]
+        with self._lock:
+            self.bytes_read += n_bytes
+
+        entries.sort(key=lambda e: (
+            e["date"] or datetime.min,
+            e["game"] or 0,
+            e["fname"]
+        ))
+        return entries, errors
+
+    def _read_many(self, paths):
+        """
+        Lit et décode une liste de fichiers, en parallèle si configuré.
+        Retourne, dans l'ordre, le JSON décodé ou l'exception de chaque fichier.
+        """
+        if self.decode_processes > 0 and len(paths) >= PROCESS_POOL_MIN_FILES:
+            with ThreadPoolExecutor(self.io_workers) as io_pool:
+                raws = list(io_pool.map(_safe_read_bytes, paths))
+            decode = partial(_safe_decode_json, fields=self.fields)
+            with ProcessPoolExecutor(self.decode_processes) as decode_pool:
+                chunksize = max(1, len(raws) // (4 * self.decode_processes))
+                return list(decode_pool.map(decode, raws, chunksize=chunksize))
+
+        load = partial(_safe_read_match_file, fields=self.fields)
+        if self.io_workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(self.io_workers) as io_pool:
+                return list(io_pool.map(load, paths))
+
+        return [load(path) for path in paths]
+
+    def _read_bundles(self, folder, bundled):
+        """
+        Lit les matchs manquants des lots, un seul passage par lot (lots en
+        parallèle). bundled : {(lot, signature): [(membre, (fname, path,
+        signature))]}, membre None pour un lot illisible listé sous son nom.
+        Retourne [((fname, path, signature), JSON décodé ou exception)].
+        """
+        def read(key):
+            bundle, signature = key
+            path = os.path.join(folder, bundle)
+            items = bundled[key]
+            data, n_bytes = read_bundle(
+                path, signature, [member for member, _ in items if member is not None], self.fields
+            )
+            with self._lock:
+                self.bytes_read += n_bytes
+            return [
+                (item, data[member] if member is not None else _bundle_error(path, signature))
+                for member, item in items
+            ]
+
+        if self.io_workers > 1 and len(bundled) > 1:
+            with ThreadPoolExecutor(self.io_workers) as io_pool:
+                return [result for results in io_pool.map(read, bundled) for result in results]
+        return [result for key in bundled for result in read(key)]
+
+    def _store(self, path, fname, signature, data):
+        entry = {
+            "path":      path,
+            "signature": signature,
+            "fname":     fname,
+            "date":      parse_date_from_filename(fname),
+            "game":      parse_game_number(fname),
+            "data":      data
+        }
+        with self._lock:
+            self._entries[path] = (signature, entry)
+            self.misses += 1
+        return entry
+
+    def stats(self):
+        """
+        Compteurs cumulés : fichiers servis depuis le cache (hits), fichiers
+        lus et décodés (misses) et octets lus (décompressés pour les lots).
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes_read": self.bytes_read}
+
+    def evict_missing(self, folder, files):
+        """
+        Retire du cache les fichiers du dossier absents de `files` (liste
+        complète {fname: signature} du dossier) : fichiers supprimés ou
+        renommés, membres retirés d'un lot.
+        """
+        prefix = os.path.join(folder, "")
+        seen = {os.path.join(folder, fname) for fname in files}
+        with self._lock:
+            stale = [
+                path for path in self._entries
+                if path.startswith(prefix) and path not in seen
+            ]
+            for path in stale:
+                del self._entries[path]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,193 @@
+"""
+Instrumentation optionnelle du dashboard (temps par étape, compteurs, caches).
+
+Un Profiler est activé pour la durée d'un rerun (activate / deactivate) ;
+les modules l'alimentent via les fonctions de ce module, qui ne font rien
+quand aucun profiler n'est actif :
+
+    with stage("fusion"):        # temps et nombre d'appels d'une étape
+        ...
+    count("fichiers lus", 3)     # compteur libre
+
+    @profiled("participant_table", cache=True)   # appels (cache compris)
+    @st.cache_resource(max_entries=8)
+    @cache_miss("participant_table")             # exécutions réelles
+    def participant_table(...): ...
+
+Les compteurs propres aux caches partagés (MatchCache.hits, IconStore.
+downloads, ...) sont suivis par watch() : le rapport donne leur variation
+pendant le rerun. Ces caches sont communs à toutes les sessions : un rerun
+concurrent d'une autre session est compté aussi.
+
+Le profiler est porté par une ContextVar : seul le thread du rerun le voit
+(les pools de threads d'ingestion et d'icônes passent par watch()).
+
+Activation : variable d'environnement DASHBOARD_PROFILE=1 ou paramètre d'URL
+?profile=1. Chaque rerun profilé est ajouté en une ligne JSON à PROFILE_LOG.
+"""
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+PROFILE_ENV = "DASHBOARD_PROFILE"
+PROFILE_LOG = "profile_log.jsonl"
+
+_current = ContextVar("profiler", default=None)
+
+
+def profiling_enabled(query_value=None):
+    """
+    Vrai si l'instrumentation est demandée par l'environnement ou par la
+    valeur du paramètre d'URL `profile`.
+    """
+    values = (os.environ.get(PROFILE_ENV, ""), query_value or "")
+    return any(value.lower() in ("1", "true", "yes", "on") for value in values)
+
+
+class Profiler:
+    """
+    Mesures d'un rerun : étapes {nom: [secondes, appels]}, compteurs libres,
+    appels / misses des fonctions en cache et variations des compteurs
+    surveillés. Les étapes peuvent s'imbriquer : leurs temps se recouvrent.
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.created = datetime.now()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = Counter()
+        self.cache_calls = Counter()
+        self.cache_misses = Counter()
+        self._watched = {}  # nom -> (getter, valeurs initiales)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += time.perf_counter() - start
+            totals[1] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def watch(self, name, getter):
+        """
+        Suit les compteurs retournés par getter() ({clé: nombre}) : le
+        rapport donne leur variation depuis cet appel.
+        """
+        self._watched[name] = (getter, dict(getter()))
+
+    def report(self):
+        """
+        Rapport sérialisable en JSON du rerun.
+        """
+        watched = {}
+        for name, (getter, initial) in self._watched.items():
+            current = getter()
+            watched[name] = {key: current[key] - initial.get(key, 0) for key in current}
+
+        return {
+            "created":  self.created.isoformat(timespec="seconds"),
+            "label":    self.label,
+            "seconds":  round(time.perf_counter() - self.started, 6),
+            "stages":   {
+                name: {"seconds": round(seconds, 6), "calls": calls}
+                for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0])
+            },
+            "counters": dict(self.counters),
+            "caches":   {
+                name: {
+                    "calls":  calls,
+                    "misses": self.cache_misses[name],
+                    "hits":   calls - self.cache_misses[name]
+                }
+                for name, calls in self.cache_calls.items()
+            },
+            "watched":  watched
+        }
+
+
+def write_log(report, path=PROFILE_LOG):
+    """
+    Ajoute un rapport en une ligne JSON au journal.
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+
+
+def activate(profiler):
+    """
+    Rend `profiler` actif dans le contexte courant. Retourne le jeton à
+    passer à deactivate.
+    """
+    return _current.set(profiler)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """
+    Chronomètre une étape sur le profiler actif.
+    """
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def count(name, n=1):
+    profiler = _current.get()
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def profiled(name, cache=False):
+    """
+    Décorateur : chaque appel est une étape `name`. Avec cache=True, les
+    appels sont aussi comptés comme accès au cache `name` (voir cache_miss).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _current.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            if cache:
+                profiler.cache_calls[name] += 1
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        # Fonction en cache (st.cache_*) : son clear() reste accessible
+        if hasattr(func, "clear"):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorator
+
+
+def cache_miss(name):
+    """
+    Décorateur à placer sous le décorateur de cache : le corps n'est exécuté
+    (et compté) qu'en cas de miss.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _current.get()
+            if profiler is not None:
+                profiler.cache_misses[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,17 +1,29 @@
 import streamlit as st
 import pandas as pd
-import json
 import os
-import re
-from datetime import datetime
-from collections import Counter, defaultdict
-import requests
-from PIL import Image
-from io import BytesIO
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+
+from aggregates import ROLE_PAIRS, PartialCache, merge_partials
+from database import QUERIES, QUERY_ERRORS, MatchDatabase
+from ddragon import ddragon_version_for, local_versions
+from figures import (
+    BASE_TEMPLATE, RADAR_METRICS, cache_stats as figure_cache_stats, comparison_radar,
+    player_radar, role_pie, winrate_gauge
+)
+from icons import THUMBNAIL_SIZE, IconStore
+from ingestion import MatchCache, folder_fingerprint, scan_folder
+from instrumentation import (
+    Profiler, activate, cache_miss, deactivate, profiled, profiling_enabled, stage, write_log
+)
+from match_index import MatchIndex
+from participants import PARTICIPANT_FIELDS, ROLES, roster_view, tag_rosters
+from rosters import ROSTERS_FILE, IdentityIndex, display_names, load_rosters, rosters_key
+from snapshot import DEFAULT_FOLDERS, load_participants
+from stats import (
+    FORM_METRICS, champion_pool, compositions, duos, match_details, matchups,
+    player_averages, player_form, player_summary, role_distribution, team_summary
+)
+from watcher import FolderWatcher
 
 # Configuration de la page
 st.set_page_config(
@@ -53,447 +65,486 @@ st.markdown("""
 # 1. Paramètres communs
 # -----------------------------
 
-TEAM_PLAYERS = [
-    "",
-    "Peche le coquin",
-    "ManGros Fish",
-    "gumaguccy",
-    "Cheikh Sadri"
-]
-
-# Pour un affichage plus lisible
-DISPLAY_NAME = {
-    "": "Nireo",
-    "Peche le coquin": "Peche",
-    "ManGros Fish": "Jawa",
-    "gumaguccy": "kross",
-    "Cheikh Sadri": "iench taric"
-}
-
-ROLE_MAPPING = {
-    "TOP": "TOP",
-    "JUNGLE": "JUNGLE",
-    "MIDDLE": "MIDDLE",
-    "MID": "MIDDLE",
-    "BOTTOM": "BOTTOM",
-    "BOT": "BOTTOM",
-    "UTILITY": "UTILITY",
-    "SUPPORT": "UTILITY"
-}
-
-def parse_date_from_filename(filename):
+# Rosters suivis (rosters.json) : {nom du roster: {joueur: {"display", "puuids", "aliases"}}}
+ROSTERS = load_rosters()
+# Reconnaissance des joueurs dans les matchs (PUUID, puis pseudo)
+IDENTITIES = IdentityIndex(ROSTERS)
+
+# Intervalle (secondes) de vérification des nouveaux fichiers de match
+LIVE_REFRESH_SECONDS = 2
+
+# Vues du dashboard : seule la vue sélectionnée est calculée et affichée
+VIEWS = ["Statistiques générales", "Champions", "Tournoi", "Drafts", "Requêtes SQL"]
+
+# Caches partagés par toutes les sessions (LRU) : versions d'un dossier
+# gardées (tables, index) et résultats par jeu de filtres (totaux, séries)
+SHARED_TABLE_ENTRIES = 8
+SHARED_RESULT_ENTRIES = 64
+
+@st.cache_resource
+def get_match_cache():
+    """
+    Cache des matchs partagé par toutes les sessions et tous les reruns :
+    seuls les fichiers nouveaux ou modifiés sont relus, et seuls les champs
+    utilisés par le dashboard sont décodés.
+    """
+    return MatchCache(fields=PARTICIPANT_FIELDS)
+
+@profiled("participant_table", cache=True)
+@st.cache_resource(show_spinner=False, max_entries=SHARED_TABLE_ENTRIES)
+@cache_miss("participant_table")
+def participant_table(folder, fingerprint, require_date=True, roster_key=()):
     """
-    Extrait la date depuis un nom de fichier au format 'DD_MM_YYYY_GX.json'.
-    Retourne un objet datetime ou None si le nom ne correspond pas.
+    Table des participants d'un dossier (snapshot Parquet + fichiers JSON
+    récents), marquée en une passe avec le côté de chaque roster (voir
+    tag_rosters). Recalculée uniquement quand l'empreinte du dossier ou la
+    configuration des rosters (roster_key) change, et partagée en lecture
+    seule par toutes les sessions (pas de copie par rerun).
+
+    Retourne (table, sides, errors) avec errors = [(fname, message)].
+    """
+    table, errors = load_participants(folder, get_match_cache(), require_date, files=dict(fingerprint))
+    table, sides = tag_rosters(table, IDENTITIES)
+    return table, sides, [(fname, str(e)) for fname, e in errors]
+
+@st.cache_resource
+def get_folder_watcher():
+    """
+    Surveillance partagée des dossiers de matchs : les fichiers déposés sont
+    parsés en arrière-plan dans le cache des matchs.
+    """
+    return FolderWatcher(DEFAULT_FOLDERS, get_match_cache()).start()
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_refresh():
     """
-    pattern = r'^(\d{2})_(\d{2})_(\d{4})_G\d+\.json$'
-    match = re.match(pattern, filename)
-    if not match:
-        return None
-    day   = int(match.group(1))
-    month = int(match.group(2))
-    year  = int(match.group(3))
-    return datetime(year, month, day)
-
-def get_champion_icon_url(champion_name):
+    Relance l'application quand le watcher signale un fichier ajouté,
+    modifié ou supprimé dans un dossier surveillé.
     """
-    Retourne l'URL de l'icône pour le champion donné (ex: 'Renekton').
+    watcher = get_folder_watcher()
+    versions = {folder: watcher.version(folder) for folder in watcher.folders}
+    previous = st.session_state.get("watched_versions")
+    st.session_state["watched_versions"] = versions
+    if previous is not None and previous != versions:
+        st.rerun(scope="app")
+
+@st.cache_resource
+def get_partial_cache():
     """
-    ddragon_version = "15.1.1"  # À mettre à jour quand nécessaire
-    # On formate le nom du champion pour qu'il corresponde à la convention DDragon
-    formatted_name = champion_name.replace(" ", "").replace("'", "").capitalize()
-    return f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{formatted_name}.png"
+    Partiels par match partagés : seuls les matchs nouveaux sont réduits.
+    """
+    return PartialCache()
+
+@profiled("load_folder")
+def load_folder(folder, require_date=True):
+    """
+    Liste les fichiers du dossier (tenue à jour par le watcher pour les
+    dossiers surveillés, sinon scan sans lecture) et retourne, depuis les
+    caches si rien n'a changé :
+        {"files", "fingerprint", "participants", "sides", "errors", "partials"}
+    où partials = {nom du roster: {fname: partiel}} (voir aggregates.py),
+    calculés pour tous les rosters dans la même passe.
+    """
+    watcher = get_folder_watcher()
+    if folder in watcher.folders:
+        files = watcher.files(folder)
+    else:
+        with stage("scan du dossier"):
+            files = scan_folder(folder, require_date)
+    roster_key = rosters_key(ROSTERS)
+    participants, sides, errors = participant_table(folder, folder_fingerprint(files), require_date, roster_key)
+    with stage("partiels"):
+        partials = get_partial_cache().partials_for_rosters(
+            folder, participants, sides, files, roster_key
+        )
+    return {
+        "files":        files,
+        "fingerprint":  folder_fingerprint(files),
+        "participants": participants,
+        "sides":        sides,
+        "errors":       errors,
+        "partials":     partials
+    }
 
-def display_champion_stats(champion_data):
+@profiled("match_index", cache=True)
+@st.cache_resource(show_spinner=False, max_entries=SHARED_TABLE_ENTRIES)
+@cache_miss("match_index")
+def match_index(folder, fingerprint, _participants):
+    """
+    Index trié (date, game, patch) des matchs d'un dossier, reconstruit
+    uniquement quand l'empreinte du dossier change.
+    """
+    return MatchIndex.from_participants(_participants)
+
+@profiled("form_table", cache=True)
+@st.cache_resource(show_spinner=False, max_entries=SHARED_RESULT_ENTRIES)
+@cache_miss("form_table")
+def form_table(folder, fingerprint, roster_key, roster_name, selected, window, method, _participants, _sides):
+    """
+    Séries de forme (stats.player_form) du roster sur les matchs
+    sélectionnés, mises en cache par dossier, configuration des rosters,
+    sélection et lissage.
+    """
+    roster = display_names(ROSTERS[roster_name])
+    view = roster_view(_participants, _sides, roster_name, list(roster))
+    view = view[view["fname"].isin(selected)]
+    return player_form(view, window, method, roster)
+
+@profiled("filtered_totals", cache=True)
+@st.cache_resource(show_spinner=False, max_entries=SHARED_RESULT_ENTRIES)
+@cache_miss("filtered_totals")
+def filtered_totals(folder, fingerprint, roster_key, roster_name, selected, _partials):
+    """
+    Partiels du roster fusionnés sur les matchs `selected` (tous si None),
+    partagés par les sessions qui affichent le même jeu de filtres. Le
+    résultat est commun à toutes les sessions : il ne doit pas être modifié.
+    """
+    if selected is None:
+        return merge_partials(_partials.values())
+    return merge_partials(_partials[fname] for fname in selected if fname in _partials)
+
+def match_filters(index):
+    """
+    Filtres de la sidebar (période, patchs). Retourne les fichiers des matchs
+    sélectionnés, dans l'ordre chronologique.
+    """
+    st.sidebar.header("Filtres")
+    first_date, last_date = index.date_bounds()
+    start, end = None, None
+    if first_date is not None:
+        period = st.sidebar.date_input(
+            "Période",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date
+        )
+        # Pendant la sélection, date_input ne renvoie que la date de début
+        period = tuple(period) if isinstance(period, (list, tuple)) else (period,)
+        start = period[0] if period else None
+        end = period[1] if len(period) > 1 else None
+
+    patches = st.sidebar.multiselect("Patchs", index.patch_list(), placeholder="Tous les patchs")
+    return index.select(start, end, patches)
+
+@profiled("rendu des graphiques")
+def show_chart(fig):
+    """
+    Affiche une figure Plotly sur toute la largeur (sérialisation comprise).
+    """
+    st.plotly_chart(fig, use_container_width=True)
+
+@profiled("rendu des tableaux")
+def show_table(data, **kwargs):
+    """
+    st.dataframe ; le style pandas (dégradés, formats) est calculé ici.
+    """
+    st.dataframe(data, **kwargs)
+
+def latest_ddragon_version(participants):
+    """
+    Version DDragon (icônes et noms des champions) du match le plus récent.
+    """
+    return ddragon_version_for(
+        participants["game_version"].iloc[-1] if not participants.empty else None,
+        local_versions()
+    )
+
+@st.cache_resource(show_spinner="Préchargement des données...")
+def warm_up():
+    """
+    Préchargement partagé, une fois par processus : au premier rerun après
+    le démarrage du serveur (ou après invalidate_shared_caches), avant
+    l'affichage. Charge les tables et partiels de chaque dossier, fusionne
+    la sélection par défaut (tous les matchs) de chaque roster et prépare
+    les vignettes des champions joués ; les sessions suivantes ne font que
+    relire ces caches.
+    """
+    roster_key = rosters_key(ROSTERS)
+    for folder, require_date in DEFAULT_FOLDERS.items():
+        if not os.path.exists(folder):
+            continue
+        data = load_folder(folder, require_date)
+        if require_date:
+            index = match_index(folder, data["fingerprint"], data["participants"])
+            first_date, last_date = index.date_bounds()
+            selected = tuple(index.select(first_date, last_date, []))
+        else:
+            selected = None
+        for roster_name in ROSTERS:
+            filtered_totals(folder, data["fingerprint"], roster_key, roster_name, selected, data["partials"][roster_name])
+
+        participants = data["participants"]
+        if not participants.empty:
+            get_icon_store().prefetch(
+                latest_ddragon_version(participants),
+                participants.loc[participants["ROSTER"].notna(), "SKIN"].unique(),
+                size=THUMBNAIL_SIZE
+            )
+    return True
+
+def invalidate_shared_caches():
+    """
+    Invalidation manuelle : vide les tables, index et résultats partagés
+    (toutes sessions) et les caches de matchs et de partiels, puis re-liste
+    tous les dossiers surveillés ; le rerun suivant relit les dossiers et
+    refait le préchargement.
+
+    L'invalidation automatique passe par les clés des caches (empreinte du
+    dossier, configuration des rosters) : une game déposée crée de nouvelles
+    entrées et les anciennes sortent des LRU.
+    """
+    for cached in (participant_table, match_index, form_table, filtered_totals, warm_up):
+        cached.clear()
+    get_match_cache().clear()
+    get_partial_cache().clear()
+    get_icon_store().clear_failures()
+    get_folder_watcher().rescan_all()
+
+@st.cache_resource
+def get_database():
+    """
+    Base SQLite partagée des requêtes ad hoc : chaque dossier n'y est recopié
+    que quand son empreinte ou la configuration des rosters change.
+    """
+    return MatchDatabase()
+
+@st.cache_resource
+def get_icon_store():
+    """
+    Cache d'icônes partagé : chaque PNG est téléchargé au plus une fois.
+    """
+    return IconStore()
+
+def winrate_color(winrate):
+    """
+    Couleur d'affichage d'un winrate (vert, orange, rouge).
+    """
+    if winrate >= 60:
+        return "#66BB6A"  # Vert
+    if winrate >= 50:
+        return "#FFA726"  # Orange
+    return "#FF4B4B"  # Rouge
+
+def champion_card_html(champ_name, icon_uri, games, winrate):
+    """
+    Carte HTML d'un champion : vignette (ou nom si l'icône est introuvable),
+    nombre de parties, winrate et barre de progression.
+    """
+    color = winrate_color(winrate)
+    if icon_uri is not None:
+        icon = f"<img src='{icon_uri}' width='{THUMBNAIL_SIZE}'>"
+    else:
+        icon = f"<p style='color: #FFFFFF; font-size: 16px;'>{champ_name}</p>"
+    return f"""
+        <div style="
+            background-color: rgba(255,255,255,0.1);
+            border-radius: 8px;
+            padding: 12px;
+            margin: 8px 0;
+            border: 1px solid rgba(255,255,255,0.1);
+            display: grid;
+            grid-template-columns: 80px 1fr;
+            gap: 10px;
+            align-items: center;
+        ">
+            <div style="text-align: center;">{icon}</div>
+            <div style="
+                text-align: left;
+                display: flex;
+                flex-direction: column;
+                justify-content: center;
+            ">
+                <h4 style="
+                    color: #FFFFFF;
+                    font-size: 18px;
+                    font-weight: bold;
+                    margin: 0 0 5px 0;
+                ">{champ_name}</h4>
+                <p style="
+                    color: #CCCCCC;
+                    font-size: 14px;
+                    margin: 0 0 5px 0;
+                ">Parties: {games}</p>
+                <p style="
+                    color: {color};
+                    font-weight: bold;
+                    font-size: 16px;
+                    margin: 0 0 5px 0;
+                ">Winrate: {winrate:.1f}%</p>
+                <div style="background-color: rgba(255,255,255,0.15); border-radius: 4px; height: 6px;">
+                    <div style="background-color: {color}; border-radius: 4px; height: 6px; width: {min(max(winrate, 0), 100):.1f}%;"></div>
+                </div>
+            </div>
+        </div>
+    """
+
+@profiled("grille des champions")
+def display_champion_stats(champion_data, ddragon_version, roster):
     """
     Affiche dans l'onglet "Champions" les champions joués par chaque joueur,
     leur icône, le nombre de games et le taux de victoire (win rate).
+
+    Chaque colonne de joueur est construite en une passe et envoyée en un
+    seul bloc HTML (un élément Streamlit par joueur au lieu de plusieurs par
+    champion).
+
+    champion_data : résultat de stats.champion_pool (une ligne par
+    (PLAYER, SKIN), déjà triée par games puis winrate).
+    ddragon_version : version DDragon des icônes et des noms affichés.
+    roster : {joueur: nom affiché} du roster sélectionné.
     """
     st.subheader("Statistiques des champions par joueur")
     
-    cols = st.columns(len(TEAM_PLAYERS))
+    # Préchargement parallèle de toutes les icônes avant de dessiner la grille
+    icon_store = get_icon_store()
+    with stage("préchargement des icônes"):
+        icon_store.prefetch(ddragon_version, champion_data["SKIN"].unique(), size=THUMBNAIL_SIZE)
+    champion_index = icon_store.champion_index(ddragon_version)
+
+    # Cartes de chaque joueur, dans l'ordre de champion_data
+    cards = {player: [] for player in roster}
+    for stats in champion_data.itertuples(index=False):
+        if stats.PLAYER in cards:
+            cards[stats.PLAYER].append(champion_card_html(
+                champion_index.display_name(stats.SKIN),
+                icon_store.thumbnail_data_uri(ddragon_version, stats.SKIN),
+                stats.games,
+                stats.winrate
+            ))
+    
+    cols = st.columns(len(roster))
     
-    for idx, player in enumerate(TEAM_PLAYERS):
-        displayed_name = DISPLAY_NAME.get(player, player)
+    for idx, (player, displayed_name) in enumerate(roster.items()):
         
         with cols[idx]:
-            st.markdown(
-                f"""
+            header = f"""
+                <h3 style="
+                    color: #FFFFFF;
+                    font-size: 24px;
+                    font-weight: bold;
+                    text-align: center;
+                    margin-bottom: 20px;
+                    text-shadow: 2px 2px 4px rgba(0,0,0,0.5);
+                ">{displayed_name}</h3>
+            """
+            column = f"""
                 <div style="
                     background-color: #1E1E1E;
                     border-radius: 10px;
                     padding: 15px;
                     margin-bottom: 20px;
                 ">
-                    <h3 style="
-                        color: #FFFFFF;
-                        font-size: 24px;
-                        font-weight: bold;
-                        text-align: center;
-                        margin-bottom: 20px;
-                        text-shadow: 2px 2px 4px rgba(0,0,0,0.5);
-                    ">{displayed_name}</h3>
-                """,
-                unsafe_allow_html=True
-            )
-            
-            if player in champion_data:
-                # On trie les champions par nombre de parties jouées puis par winrate
-                champs = sorted(
-                    champion_data[player].items(),
-                    key=lambda x: (
-                        x[1]['games'],
-                        (x[1]['wins'] / x[1]['games']) if x[1]['games'] > 0 else 0
-                    ),
-                    reverse=True
-                )
-                
-                for champ_name, stats in champs:
-                    # Calcul du winrate
-                    winrate = 0
-                    if stats['games'] > 0:
-                        winrate = (stats['wins'] / stats['games']) * 100
-                    
-                    # Couleur du winrate
-                    if winrate >= 60:
-                        color = "#66BB6A"  # Vert
-                    elif winrate >= 50:
-                        color = "#FFA726"  # Orange
-                    else:
-                        color = "#FF4B4B"  # Rouge
-                    
-                    # Container pour chaque champion avec grille fixe
-                    st.markdown(
-                        f"""
-                        <div style="
-                            background-color: rgba(255,255,255,0.1);
-                            border-radius: 8px;
-                            padding: 12px;
-                            margin: 8px 0;
-                            border: 1px solid rgba(255,255,255,0.1);
-                            display: grid;
-                            grid-template-columns: 80px 1fr;
-                            gap: 10px;
-                            align-items: center;
-                        ">
-                            <div style="text-align: center;">
-                        """,
-                        unsafe_allow_html=True
-                    )
-                    
-                    # Affichage de l'icône du champion
-                    try:
-                        icon_url = get_champion_icon_url(champ_name)
-                        response = requests.get(icon_url)
-                        img = Image.open(BytesIO(response.content))
-                        st.image(img, width=60)
-                    except:
-                        st.markdown(f"<p style='color: #FFFFFF; font-size: 16px;'>{champ_name}</p>", unsafe_allow_html=True)
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
-                    
-                    # Affichage des stats avec mise en forme
-                    st.markdown(
-                        f"""
-                        <div style="
-                            text-align: left;
-                            display: flex;
-                            flex-direction: column;
-                            justify-content: center;
-                        ">
-                            <h4 style="
-                                color: #FFFFFF;
-                                font-size: 18px;
-                                font-weight: bold;
-                                margin: 0 0 5px 0;
-                            ">{champ_name}</h4>
-                            <p style="
-                                color: #CCCCCC;
-                                font-size: 14px;
-                                margin: 0 0 5px 0;
-                            ">Parties: {stats['games']}</p>
-                            <p style="
-                                color: {color};
-                                font-weight: bold;
-                                font-size: 16px;
-                                margin: 0 0 5px 0;
-                            ">
-                                Winrate: {winrate:.1f}%
-                            </p>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
-                    
-                    # Barre de progression pour le winrate
-                    st.progress(winrate / 100)
-            else:
+                    {header}
+                    {"".join(cards[player])}
+                </div>
+            """
+            # Un seul bloc HTML sans lignes vides ni indentation (sinon le
+            # Markdown le couperait en blocs de code)
+            st.markdown("".join(line.strip() for line in column.splitlines()), unsafe_allow_html=True)
+            if not cards[player]:
                 st.info("Pas de données")
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+
+def instrumentation_panel(report):
+    """
+    Panneau de debug de la sidebar : temps par étape, accès aux caches et
+    compteurs du rerun (voir instrumentation.py).
+    """
+    with st.sidebar.expander("Instrumentation", expanded=True):
+        st.write(f"**Rerun :** {report['seconds'] * 1000:.0f} ms ({report['label']})")
+
+        st.markdown("**Étapes**")
+        st.dataframe(pd.DataFrame([
+            {"Étape": name, "ms": stats["seconds"] * 1000, "Appels": stats["calls"]}
+            for name, stats in report["stages"].items()
+        ]).round({"ms": 1}), hide_index=True)
+
+        st.markdown("**Caches**")
+        caches = [
+            {"Cache": name, "Hits": stats["hits"], "Misses": stats["misses"]}
+            for name, stats in report["caches"].items()
+        ] + [
+            {
+                "Cache":  name,
+                "Hits":   stats.get("hits", stats.get("memory_hits", 0)),
+                "Misses": stats.get("misses", stats.get("disk_reads", 0) + stats.get("downloads", 0))
+            }
+            for name, stats in report["watched"].items()
+        ]
+        st.dataframe(pd.DataFrame(caches), hide_index=True)
+
+        st.markdown("**Compteurs**")
+        st.json({**report["counters"], **{
+            f"{name}.{key}": value
+            for name, stats in report["watched"].items() for key, value in stats.items()
+        }}, expanded=False)
 
 # -------------------------------------------------------------
-# 2. Début de l'application Streamlit avec création des onglets
+# 2. Début de l'application Streamlit avec navigation entre les vues
 # -------------------------------------------------------------
-def main():
-    st.title("Statistiques Ancient Ones")
+def render_dashboard():
+    if not ROSTERS:
+        st.error(f"Aucun roster configuré dans '{ROSTERS_FILE}'.")
+        return
+
+    # Roster affiché : les agrégats de tous les rosters sont calculés dans la même passe
+    if len(ROSTERS) > 1:
+        roster_name = st.sidebar.selectbox("Roster", list(ROSTERS))
+    else:
+        roster_name = next(iter(ROSTERS))
+    roster = display_names(ROSTERS[roster_name])
+
+    st.title(f"Statistiques {roster_name}")
+
+    # Navigation : contrairement à st.tabs, les vues non sélectionnées ne
+    # sont pas exécutées à chaque rerun
+    view = st.radio("Vue", VIEWS, horizontal=True, label_visibility="collapsed", key="view")
+
+    # Rafraîchissement automatique à l'arrivée de nouvelles games
+    live_refresh()
+
+    if st.sidebar.button("Recharger les données", help="Vide les caches partagés par toutes les sessions"):
+        invalidate_shared_caches()
+        st.rerun()
+
+    # Caches partagés préchargés une fois par processus
+    warm_up()
+
+    # Scrims chargés une seule fois, puis filtrés par période / patch. Les
+    # filtres restent affichés sur toutes les vues pour conserver leur état ;
+    # la fusion des partiels n'est faite que pour les vues scrims.
+    json_folder = "scrims_json"
+    scrims = load_folder(json_folder) if os.path.exists(json_folder) else None
+    if scrims is not None:
+        index = match_index(json_folder, scrims["fingerprint"], scrims["participants"])
+        selected = match_filters(index)
+        if view != "Tournoi":
+            scrim_totals = filtered_totals(
+                json_folder, scrims["fingerprint"], rosters_key(ROSTERS), roster_name,
+                tuple(selected), scrims["partials"][roster_name]
+            )
 
-    # Création des onglets
-    tab1, tab2, tab3, tab4 = st.tabs(["Statistiques générales", "Champions", "Tournoi", "Drafts"])
+        # Icônes et noms des champions selon le patch du match le plus récent
+        ddragon_version = latest_ddragon_version(scrims["participants"])
 
     # ----------------------------------------------
-    # Onglet 1 : Statistiques générales (Scrims)
+    # Vue 1 : Statistiques générales (Scrims)
     # ----------------------------------------------
-    with tab1:
-        # 1) Dossier JSON
-        json_folder = "scrims_json"
-        if not os.path.exists(json_folder):
+    if view == "Statistiques générales":
+        if scrims is None:
             st.error(f"Le dossier '{json_folder}' n'existe pas.")
         else:
-            # 2) Lister fichiers JSON + parse date
-            all_files = [f for f in os.listdir(json_folder) if f.endswith(".json")]
-            date_files = []
-            for fname in all_files:
-                file_date = parse_date_from_filename(fname)
-                if file_date is None:
-                    continue
-                date_files.append((file_date, fname))
-
-            if not date_files:
+            # Matchs chargés (date extraite du nom de fichier, cache)
+            participants, scrim_errors = scrims["participants"], scrims["errors"]
+            for fname, e in scrim_errors:
+                st.error(f"Erreur lecture {fname} : {e}")
+
+            if participants.empty:
                 st.warning("Aucun fichier JSON au format attendu trouvé.")
             else:
                 # -------------------------------------------------------
-                # Stats d'équipe (objectifs, kills, etc.)
-                # -------------------------------------------------------
-                nb_matches_parsed = 0
-                total_wins = 0
-
-                total_drakes  = 0
-                total_barons  = 0
-                total_herald  = 0
-                total_towers  = 0
-                total_grubs   = 0
-
-                total_team_kills  = 0
-                total_team_deaths = 0
-
-                total_first_blood_kills = 0
-                total_first_blood_assists = 0
-                total_team_damage = 0
-                total_game_duration = 0
-
-                # Early game stats
-                total_team_cs_15 = 0
-                total_team_gold_diff_15 = 0
-                first_dragon_count = 0
-                first_herald_count = 0
-
-                # Vision stats
-                total_team_vision_score = 0
-                total_team_vision_per_min = 0
-                total_control_wards = 0
-                total_wards_killed = 0
-
-                # -------------------------------------------------------
-                # Stats par joueur
-                # -------------------------------------------------------
-                data_players = {
-                    name: {
-                        "Kills":   0,
-                        "Deaths":  0,
-                        "Assists": 0,
-                        "Gold":    0,
-                        "Damage":  0,
-                        "NbGames": 0,
-                        "KP":      0  # Kill Participation
-                    }
-                    for name in TEAM_PLAYERS
-                }
-
-                # -------------------------------------------------------
-                # Stats par rôle
-                # -------------------------------------------------------
-                data_roles = {
-                    "TOP":     {"Gold": 0, "Damage": 0},
-                    "JUNGLE":  {"Gold": 0, "Damage": 0},
-                    "MIDDLE":  {"Gold": 0, "Damage": 0},
-                    "BOTTOM":  {"Gold": 0, "Damage": 0},
-                    "UTILITY": {"Gold": 0, "Damage": 0},
-                }
-
-                data_roles_games_count = {
-                    "TOP": 0,
-                    "JUNGLE": 0,
-                    "MIDDLE": 0,
-                    "BOTTOM": 0,
-                    "UTILITY": 0
-                }
-
-                # -------------------------------------------------------
-                # Stats de champions : { player_name : { champ_name : {games, wins} } }
+                # Partiels fusionnés des matchs sélectionnés (filtres)
                 # -------------------------------------------------------
-                champion_stats = defaultdict(lambda: defaultdict(lambda: {'games': 0, 'wins': 0}))
-
-                # -------------------------------------------------------
-                # Parcours des matchs
-                # -------------------------------------------------------
-                for d, fname in date_files:
-                    path = os.path.join(json_folder, fname)
-                    with open(path, "r", encoding="utf-8") as f:
-                        match_data = json.load(f)
-
-                    participants = match_data.get("participants", [])
-                    if not participants:
-                        continue
-
-                    # Identifier la team "100" ou "200" de nos joueurs
-                    team_candidates = []
-                    for p in participants:
-                        player_name = p.get("NAME", "")
-                        if player_name in TEAM_PLAYERS:
-                            team_candidates.append(p.get("TEAM"))
-
-                    if not team_candidates:
-                        continue
-
-                    from collections import Counter
-                    c = Counter(team_candidates)
-                    my_team = c.most_common(1)[0][0]  # ex: "100" ou "200"
-
-                    # Vérifier si la team a gagné
-                    team_win = any(
-                        p.get("TEAM") == my_team and p.get("WIN", "").lower() == "win"
-                        for p in participants
-                    )
-                    if team_win:
-                        total_wins += 1
-
-                    match_team_kills  = 0
-                    match_team_deaths = 0
-                    match_team_drakes = 0
-                    match_team_barons = 0
-                    match_team_herald = 0
-                    match_team_towers = 0
-                    match_team_grubs  = 0
-
-                    # Stats d'équipe
-                    for p in participants:
-                        if p.get("TEAM") == my_team:
-                            kills  = int(p.get("CHAMPIONS_KILLED", 0))
-                            deaths = int(p.get("NUM_DEATHS", 0))
-                            drakes = int(p.get("DRAGON_KILLS", 0))
-                            barons = int(p.get("BARON_KILLS", 0))
-                            herald = int(p.get("RIFT_HERALD_KILLS", 0))
-                            towers = int(p.get("TURRET_TAKEDOWNS", 0))
-                            grubs  = int(p.get("HORDE_KILLS", 0))
-                            
-                            # Nouvelles stats
-                            game_duration = float(p.get("TIME_PLAYED", 0)) / 60  # en minutes
-                            first_blood_kill = p.get("FIRST_BLOOD_KILL", False)
-                            first_blood_assist = p.get("FIRST_BLOOD_ASSIST", False)
-                            cs_per_min = int(p.get("MINIONS_KILLED", 0)) / game_duration if game_duration > 0 else 0
-                            vision_per_min = int(p.get("VISION_SCORE", 0)) / game_duration if game_duration > 0 else 0
-                            
-                            # Stats à 15 minutes
-                            cs_diff_15 = float(p.get("CS_DIFF_AT_15", 0))
-                            gold_diff_15 = float(p.get("GOLD_DIFF_AT_15", 0))
-                            xp_diff_15 = float(p.get("XP_DIFF_AT_15", 0))
-
-                            match_team_kills  += kills
-                            match_team_deaths += deaths
-                            match_team_drakes += drakes
-                            match_team_barons += barons
-                            match_team_herald += herald
-                            match_team_towers += towers
-                            match_team_grubs  += grubs
-
-                            # Mise à jour des stats first blood
-                            if first_blood_kill:
-                                total_first_blood_kills += 1
-                            if first_blood_assist:
-                                total_first_blood_assists += 1
-
-                            # Mise à jour des dégâts et durée de partie
-                            damage_to_champs = int(p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0")) if p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0").isdigit() else 0
-                            total_team_damage += damage_to_champs
-                            total_game_duration += game_duration
-
-                            # Mise à jour des stats early game
-                            cs_15 = float(p.get("MINIONS_KILLED_AT_15", "0")) if p.get("MINIONS_KILLED_AT_15", "0").replace(".", "").isdigit() else 0
-                            gold_diff_15 = float(p.get("GOLD_DIFF_AT_15", "0")) if p.get("GOLD_DIFF_AT_15", "0").replace("-", "").replace(".", "").isdigit() else 0
-                            
-                            total_team_cs_15 += cs_15
-                            total_team_gold_diff_15 += gold_diff_15
-
-                            # First objectives
-                            if p.get("FIRST_DRAGON_KILL", False):
-                                first_dragon_count += 1
-                            if p.get("FIRST_HERALD_KILL", False):
-                                first_herald_count += 1
-
-                            # Vision stats
-                            vision_score = int(p.get("VISION_SCORE", "0")) if p.get("VISION_SCORE", "0").isdigit() else 0
-                            control_wards = int(p.get("VISION_WARDS_BOUGHT_IN_GAME", "0")) if p.get("VISION_WARDS_BOUGHT_IN_GAME", "0").isdigit() else 0
-                            wards_killed = int(p.get("WARDS_KILLED", "0")) if p.get("WARDS_KILLED", "0").isdigit() else 0
-                            
-                            total_team_vision_score += vision_score
-                            total_control_wards += control_wards
-                            total_wards_killed += wards_killed
-
-                    total_team_kills  += match_team_kills
-                    total_team_deaths += match_team_deaths
-                    total_drakes      += match_team_drakes
-                    total_barons      += match_team_barons
-                    total_herald      += match_team_herald
-                    total_towers      += match_team_towers
-                    total_grubs       += match_team_grubs
-
-                    # Stats par joueur + Stats par rôle + Stats de champion
-                    for p in participants:
-                        name = p.get("NAME", "")
-                        if name not in data_players:
-                            continue
-
-                        kills    = int(p.get("CHAMPIONS_KILLED", 0))
-                        deaths   = int(p.get("NUM_DEATHS", 0))
-                        assists  = int(p.get("ASSISTS", 0))
-                        gold_val = int(p.get("GOLD_EARNED", "0")) if p.get("GOLD_EARNED", "0").isdigit() else 0
-                        dmg_val  = int(p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0")) if p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0").isdigit() else 0
-
-                        # Récupérer le nom du champion
-                        champ_name = p.get("SKIN", "Unknown")
-
-                        champion_stats[name][champ_name]['games'] += 1
-                        if p.get("WIN", "").lower() == "win":
-                            champion_stats[name][champ_name]['wins'] += 1
-
-                        # Kill Participation
-                        if match_team_kills > 0:
-                            kp = (kills + assists) / match_team_kills * 100
-                        else:
-                            kp = 0
-
-                        # Mise à jour des stats player
-                        data_players[name]["Kills"]   += kills
-                        data_players[name]["Deaths"]  += deaths
-                        data_players[name]["Assists"] += assists
-                        data_players[name]["Gold"]    += gold_val
-                        data_players[name]["Damage"]  += dmg_val
-                        data_players[name]["NbGames"] += 1
-                        data_players[name]["KP"]      += kp
-
-                        # Rôle
-                        role_raw = p.get("TEAM_POSITION", "") or p.get("INDIVIDUAL_POSITION", "")
-                        role_up  = role_raw.upper()
-                        role_std = ROLE_MAPPING.get(role_up, None)
-                        if role_std and role_std in data_roles:
-                            data_roles[role_std]["Gold"]   += gold_val
-                            data_roles[role_std]["Damage"] += dmg_val
-                            data_roles_games_count[role_std] += 1
-
-                    nb_matches_parsed += 1
+                nb_matches_parsed = scrim_totals["matches"]
 
                 if nb_matches_parsed == 0:
                     st.warning("Aucune partie trouvée avec nos joueurs après filtrage.")
@@ -503,32 +554,10 @@ def main():
                     # -----------------------------
                     # Stats d'équipe => Moyennes avec visualisation améliorée
                     # -----------------------------
-                    win_rate = (total_wins / nb_matches_parsed) * 100 if nb_matches_parsed > 0 else 0
-                    avg_drakes  = total_drakes      / nb_matches_parsed
-                    avg_barons  = total_barons      / nb_matches_parsed
-                    avg_herald  = total_herald      / nb_matches_parsed
-                    avg_towers  = total_towers      / nb_matches_parsed
-                    avg_grubs   = total_grubs       / nb_matches_parsed
-                    avg_kills   = total_team_kills  / nb_matches_parsed
-                    avg_deaths  = total_team_deaths / nb_matches_parsed
+                    team = team_summary(scrim_totals)
 
                     # Affichage du Win Rate avec une jauge
-                    fig_winrate = go.Figure(go.Indicator(
-                        mode = "gauge+number",
-                        value = win_rate,
-                        domain = {'x': [0, 1], 'y': [0, 1]},
-                        title = {'text': "Win Rate"},
-                        gauge = {
-                            'axis': {'range': [0, 100]},
-                            'bar': {'color': "#1E88E5"},
-                            'steps': [
-                                {'range': [0, 40], 'color': "#FF4B4B"},
-                                {'range': [40, 60], 'color': "#FFA726"},
-                                {'range': [60, 100], 'color': "#66BB6A"}
-                            ]
-                        }
-                    ))
-                    st.plotly_chart(fig_winrate, use_container_width=True)
+                    show_chart(winrate_gauge(float(team["win_rate"])))
 
                     # Statistiques des objectifs en texte
                     st.subheader("Statistiques moyennes par partie")
@@ -538,87 +567,57 @@ def main():
                     
                     with col1:
                         st.markdown("#### Combat")
-                        st.write(f"**K/D équipe :** {avg_kills:.1f} kills, {avg_deaths:.1f} morts")
-                        # st.write(f"**First Blood participation :** {(total_first_blood_kills + total_first_blood_assists) / nb_matches_parsed * 100:.1f}%")
-                        st.write(f"**Dégâts moyens par minute :** {total_team_damage / total_game_duration:.0f}")
+                        st.write(f"**K/D équipe :** {team['kills']:.1f} kills, {team['deaths']:.1f} morts")
+                        st.write(f"**Dégâts moyens par minute :** {team['damage_per_min']:.0f}")
                     
                     with col2:
                         st.markdown("#### Objectifs")
-                        st.write(f"**Mobs épiques :** {avg_drakes:.1f} dragons, {avg_barons:.1f} barons, {avg_herald:.1f} hérauts")
-                        st.write(f"**Tours :** {avg_towers:.1f} tours détruites")
-                        st.write(f"**Grubs :** {avg_grubs:.1f} grubs")
+                        st.write(f"**Mobs épiques :** {team['dragons']:.1f} dragons, {team['barons']:.1f} barons, {team['heralds']:.1f} hérauts")
+                        st.write(f"**Tours :** {team['towers']:.1f} tours détruites")
+                        st.write(f"**Grubs :** {team['grubs']:.1f} grubs")
                     
                     # Statistiques de vision
                     st.markdown("#### Vision")
                     vision_col1, vision_col2 = st.columns(2)
                     
                     with vision_col1:
-                        avg_vision_score = total_team_vision_score / nb_matches_parsed
-                        avg_vision_per_min = total_team_vision_score / total_game_duration if total_game_duration > 0 else 0
-                        st.write(f"**Score de vision moyen :** {avg_vision_score:.1f}")
-                        st.write(f"**Vision par minute :** {avg_vision_per_min:.2f}")
+                        st.write(f"**Score de vision moyen :** {team['vision_score']:.1f}")
+                        st.write(f"**Vision par minute :** {team['vision_per_min']:.2f}")
                     
                     with vision_col2:
-                        avg_control_wards = total_control_wards / nb_matches_parsed
-                        avg_wards_killed = total_wards_killed / nb_matches_parsed
-                        st.write(f"**Wards de contrôle achetées :** {avg_control_wards:.1f}")
-                        # st.write(f"**Wards ennemies détruites :** {avg_wards_killed:.1f}")
+                        st.write(f"**Wards de contrôle achetées :** {team['control_wards']:.1f}")
+                        # st.write(f"**Wards ennemies détruites :** {team['wards_killed']:.1f}")
 
                     # -----------------------------
                     # Stats par joueur => Moyennes avec visualisation améliorée
                     # -----------------------------
                     st.subheader("Statistiques des joueurs")
                     
-                    player_rows = []
-                    player_stats_for_radar = defaultdict(dict)
-                    
-                    for name, stats in data_players.items():
-                        nb = stats["NbGames"]
-                        if nb == 0:
-                            continue
-
-                        displayed_name = DISPLAY_NAME.get(name, name)
-                        avg_kills   = stats["Kills"]   / nb
-                        avg_deaths  = stats["Deaths"]  / nb
-                        avg_assists = stats["Assists"] / nb
-                        avg_gold    = stats["Gold"]    / nb
-                        avg_dmg     = stats["Damage"]  / nb
-                        avg_kp      = stats["KP"]      / nb
-                        kda = (stats["Kills"] + stats["Assists"]) / max(1, stats["Deaths"])
-                        
-                        # Nouvelles métriques
-                        cs_per_min = stats.get("CS", 0) / stats.get("GameDuration", 1) if stats.get("GameDuration", 0) > 0 else 0
-                        vision_per_min = stats.get("VisionScore", 0) / stats.get("GameDuration", 1) if stats.get("GameDuration", 0) > 0 else 0
-                        dmg_per_min = avg_dmg / stats.get("GameDuration", 1) if stats.get("GameDuration", 0) > 0 else 0
-                        avg_cs_diff_15 = stats.get("CSDiff15", 0) / nb if nb > 0 else 0
-                        avg_gold_diff_15 = stats.get("GoldDiff15", 0) / nb if nb > 0 else 0
-
-                        # Gold Efficiency approx
-                        gold_eff = (avg_dmg / avg_gold) * 100 if avg_gold > 0 else 0
-
-                        # Stockage pour le graphique radar avec nouvelles métriques
-                        player_stats_for_radar[displayed_name] = {
-                            'Kill Participation': avg_kp,
-                            'Efficiency': gold_eff,
-                            'KDA': kda,
-                            'Assists/Game': avg_assists,
-                            'Kills/Game': avg_kills
+                    # Moyennes par joueur (une ligne par joueur)
+                    players_avg = player_summary(scrim_totals, list(roster), roster)
+
+                    # Stockage pour le graphique radar
+                    player_stats_for_radar = {
+                        row["Joueur"]: {
+                            'Kill Participation': row["KP (%)"],
+                            'Efficiency': row["Gold Efficiency (%)"],
+                            'KDA': row["KDA"],
+                            'Assists/Game': row["Assists/Game"],
+                            'Kills/Game': row["Kills/Game"]
                         }
-
-                        player_rows.append({
-                            "Joueur": displayed_name,
-                            "Parties": nb,
-                            "KDA": round(kda, 2),
-                            "Kills/Game": round(avg_kills, 1),
-                            "Deaths/Game": round(avg_deaths, 1),
-                            "Assists/Game": round(avg_assists, 1),
-                            "KP (%)": round(avg_kp, 1),
-                            "Gold Efficiency (%)": round(gold_eff, 1)
-                        })
+                        for _, row in players_avg.iterrows()
+                    }
 
                     # Tableau des stats
-                    player_df = pd.DataFrame(player_rows)
-                    st.dataframe(
+                    player_df = players_avg.round({
+                        "KDA": 2,
+                        "Kills/Game": 1,
+                        "Deaths/Game": 1,
+                        "Assists/Game": 1,
+                        "KP (%)": 1,
+                        "Gold Efficiency (%)": 1
+                    })
+                    show_table(
                         player_df.style.background_gradient(subset=['KDA', 'KP (%)', 'Gold Efficiency (%)'], cmap='Blues'),
                         hide_index=True,
                         use_container_width=True
@@ -627,158 +626,90 @@ def main():
                     # Graphiques radar pour chaque joueur
                     st.subheader("Profils des joueurs")
                     
-                    # Définition des plages de valeurs pour chaque métrique
-                    metric_ranges = {
-                        'Kill Participation': {'min': 0, 'max': 100, 'good': 60},
-                        'Efficiency': {'min': 0, 'max': 150, 'good': 100},
-                        'KDA': {'min': 0, 'max': 5, 'good': 3},
-                        'Assists/Game': {'min': 0, 'max': 15, 'good': 8},
-                        'Kills/Game': {'min': 0, 'max': 10, 'good': 5}
-                    }
-
-                    # Ordre spécifique des métriques pour une meilleure lisibilité
-                    metric_order = ['Kill Participation', 'Efficiency', 'KDA', 'Assists/Game', 'Kills/Game']
-
-                    # Fonction de normalisation des valeurs
-                    def normalize_value(value, metric_range):
-                        min_val = metric_range['min']
-                        max_val = metric_range['max']
-                        normalized = min(max(value, min_val), max_val) / max_val * 100
-                        return normalized
-
                     cols = st.columns(len(player_stats_for_radar))
                     
                     for idx, (player_name, stats) in enumerate(player_stats_for_radar.items()):
                         with cols[idx]:
-                            # Normalisation des stats pour le radar
-                            categories = metric_order
-                            values = [normalize_value(stats[cat], metric_ranges[cat]) for cat in categories]
-                            
-                            fig = go.Figure()
-                            
-                            # Ajout des cercles de référence avec labels
-                            for level in [25, 50, 75, 100]:
-                                fig.add_trace(go.Scatterpolar(
-                                    r=[level] * (len(categories) + 1),
-                                    theta=categories + [categories[0]],
-                                    fill=None,
-                                    mode='lines',
-                                    line=dict(color='rgba(255,255,255,0.1)'),
-                                    showlegend=False,
-                                    hoverinfo='skip'
-                                ))
-                            
-                            # Ajout du profil du joueur
-                            fig.add_trace(go.Scatterpolar(
-                                r=values,
-                                theta=categories,
-                                fill='toself',
-                                name=player_name,
-                                fillcolor='rgba(29, 185, 84, 0.3)',  # Vert Spotify semi-transparent
-                                line=dict(color='#1DB954'),  # Vert Spotify
-                                text=[f"{stats[cat]:.1f}" for cat in categories],  # Valeurs réelles
-                                hovertemplate="%{theta}: %{text}<br>Score: %{r:.1f}%<extra></extra>"
-                            ))
-                            
-                            fig.update_layout(
-                                polar=dict(
-                                    radialaxis=dict(
-                                        visible=True,
-                                        range=[0, 100],
-                                        showticklabels=False,
-                                        gridcolor='rgba(255,255,255,0.1)'
-                                    ),
-                                    angularaxis=dict(
-                                        gridcolor='rgba(255,255,255,0.1)',
-                                        rotation=90,  # Rotation pour une meilleure lisibilité
-                                        direction="clockwise"
-                                    ),
-                                    bgcolor='rgba(0,0,0,0)'
-                                ),
-                                showlegend=False,
-                                title=dict(
-                                    text=player_name,
-                                    font=dict(size=20, color='white'),
-                                    y=0.95
-                                ),
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                margin=dict(t=100, b=100),  # Plus d'espace en haut et en bas
-                                height=400  # Hauteur fixe pour tous les graphiques
-                            )
-                            
-                            st.plotly_chart(fig, use_container_width=True)
+                            values = tuple(float(stats[metric]) for metric in RADAR_METRICS)
+                            show_chart(player_radar(player_name, values))
+
+                    # -----------------------------
+                    # Forme des joueurs au fil des games (séries lissées)
+                    # -----------------------------
+                    st.subheader("Forme des joueurs")
+
+                    form_col1, form_col2, form_col3 = st.columns(3)
+                    with form_col1:
+                        form_metric = st.selectbox("Statistique", FORM_METRICS, key="form_metric")
+                    with form_col2:
+                        form_window = st.slider("Fenêtre (games)", 2, 20, 5, key="form_window")
+                    with form_col3:
+                        form_method = st.radio(
+                            "Lissage",
+                            ["rolling", "ewm"],
+                            format_func=lambda method: "Moyenne glissante" if method == "rolling" else "Exponentielle",
+                            horizontal=True,
+                            key="form_method"
+                        )
+
+                    form_df = form_table(
+                        json_folder, scrims["fingerprint"], rosters_key(ROSTERS), roster_name, tuple(selected),
+                        form_window, form_method, participants, scrims["sides"]
+                    )
+                    with stage("construction des figures"):
+                        fig_form = px.line(
+                            form_df,
+                            x="Partie",
+                            y=form_metric,
+                            color="Joueur",
+                            markers=True,
+                            hover_data={"date": "|%d/%m/%Y"},
+                            title=f"{form_metric} sur les {form_window} dernières games",
+                            template=BASE_TEMPLATE
+                        )
+                    show_chart(fig_form)
 
                     # -----------------------------
                     # Répartition par Rôle avec graphiques améliorés
                     # -----------------------------
                     st.subheader("Répartition des ressources par rôle")
                     
-                    role_data = []
-                    gold_tot = 0
-                    dmg_tot = 0
-                    
-                    # Calcul des totaux
-                    for role in data_roles:
-                        gold_mean = data_roles[role]["Gold"] / nb_matches_parsed
-                        dmg_mean = data_roles[role]["Damage"] / nb_matches_parsed
-                        gold_tot += gold_mean
-                        dmg_tot += dmg_mean
-                    
-                    # Préparation des données
-                    for role in ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]:
-                        gold_mean = data_roles[role]["Gold"] / nb_matches_parsed
-                        dmg_mean = data_roles[role]["Damage"] / nb_matches_parsed
-                        gold_pct = (gold_mean / gold_tot * 100) if gold_tot > 0 else 0
-                        dmg_pct = (dmg_mean / dmg_tot * 100) if dmg_tot > 0 else 0
-                        
-                        role_data.append({
-                            "Rôle": role,
-                            "Gold": gold_mean,
-                            "Gold (%)": gold_pct,
-                            "Damage": dmg_mean,
-                            "Damage (%)": dmg_pct
-                        })
-                    
-                    role_df = pd.DataFrame(role_data)
+                    role_df = role_distribution(scrim_totals)
                     
                     # Création des graphiques en camembert
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        fig_gold = px.pie(
-                            role_df,
-                            values='Gold (%)',
-                            names='Rôle',
-                            title='Répartition du Gold par rôle',
-                            color_discrete_sequence=px.colors.sequential.Blues
+                        fig_gold = role_pie(
+                            tuple(role_df['Rôle']),
+                            tuple(role_df['Gold (%)']),
+                            'Répartition du Gold par rôle',
+                            tuple(px.colors.sequential.Blues)
                         )
-                        st.plotly_chart(fig_gold, use_container_width=True)
+                        show_chart(fig_gold)
                     
                     with col2:
-                        fig_dmg = px.pie(
-                            role_df,
-                            values='Damage (%)',
-                            names='Rôle',
-                            title='Répartition des dégâts par rôle',
-                            color_discrete_sequence=px.colors.sequential.Reds
+                        fig_dmg = role_pie(
+                            tuple(role_df['Rôle']),
+                            tuple(role_df['Damage (%)']),
+                            'Répartition des dégâts par rôle',
+                            tuple(px.colors.sequential.Reds)
                         )
-                        st.plotly_chart(fig_dmg, use_container_width=True)
+                        show_chart(fig_dmg)
 
     # ----------------------------------------------
-    # Onglet 2 : Champions
+    # Vue 2 : Champions
     # ----------------------------------------------
-    with tab2:
-        # Ici on suppose que "champion_stats" est calculé dans tab1 (dans le code ci-dessus)
-        # On vérifie qu'il existe pour ne pas avoir d'erreur si l'utilisateur n'a pas encore chargé de données
-        if "champion_stats" in locals():
-            display_champion_stats(champion_stats)
+    elif view == "Champions":
+        if scrims is not None and not scrims["participants"].empty:
+            display_champion_stats(champion_pool(scrim_totals), ddragon_version, roster)
         else:
             st.warning("Veuillez d'abord charger les données dans l'onglet 'Statistiques générales'.")
 
     # ----------------------------------------------
-    # Onglet 3 : Tournoi – Moyenne des stats (pas de date)
+    # Vue 3 : Tournoi – Moyenne des stats (pas de date)
     # ----------------------------------------------
-    with tab3:
+    elif view == "Tournoi":
         st.subheader("Tournoi – Moyennes de stats par joueur (tous matchs)")
         
         # Dossier où se trouvent les fichiers de tournoi
@@ -787,80 +718,30 @@ def main():
         if not os.path.exists(tournament_folder):
             st.error(f"Le dossier '{tournament_folder}' n'existe pas.")
         else:
-            # On liste tous les .json
-            tournament_files = [f for f in os.listdir(tournament_folder) if f.endswith(".json")]
+            # On charge tous les .json (pas de contrainte sur le nom)
+            tournament = load_folder(tournament_folder, require_date=False)
+            tournament_participants, tournament_errors = tournament["participants"], tournament["errors"]
+            for fname, e in tournament_errors:
+                st.error(f"Erreur lecture {fname} : {e}")
             
-            if not tournament_files:
+            if tournament_participants.empty and not tournament_errors:
                 st.warning("Aucun fichier JSON de tournoi trouvé.")
             else:
-                # Accumulateur des stats
-                tournament_stats = []
-                
-                # Lecture de chaque fichier
-                for fname in tournament_files:
-                    path = os.path.join(tournament_folder, fname)
-                    try:
-                        with open(path, "r", encoding="utf-8") as f:
-                            match_data = json.load(f)
-                    except Exception as e:
-                        st.error(f"Erreur lecture {fname} : {e}")
-                        continue
-                    
-                    match_id = match_data.get("matchId", fname)
-                    
-                    # Parcours des participants
-                    for p in match_data.get("participants", []):
-                        name = p.get("NAME", "")
-                        if name not in TEAM_PLAYERS:
-                            continue
-                        
-                        # Extraction stats (avec fallback = 0)
-                        gold = int(p.get("GOLD_EARNED", "0")) if p.get("GOLD_EARNED", "0").isdigit() else 0
-                        dmg  = int(p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0")) if p.get("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS", "0").isdigit() else 0
-                        vis_score = int(p.get("VISION_SCORE", "0")) if p.get("VISION_SCORE", "0").isdigit() else 0
-                        ctrl_wards = int(p.get("VISION_WARDS_BOUGHT_IN_GAME", "0")) if p.get("VISION_WARDS_BOUGHT_IN_GAME", "0").isdigit() else 0
-                        kills = int(p.get("CHAMPIONS_KILLED", "0")) if p.get("CHAMPIONS_KILLED", "0").isdigit() else 0
-                        deaths = int(p.get("NUM_DEATHS", "0")) if p.get("NUM_DEATHS", "0").isdigit() else 0
-                        assists = int(p.get("ASSISTS", "0")) if p.get("ASSISTS", "0").isdigit() else 0
-                        
-                        # Calcul du KDA
-                        kda = (kills + assists) / max(1, deaths)
-                        
-                        # Ajout au DataFrame
-                        tournament_stats.append({
-                            "Match": match_id,
-                            "Player": DISPLAY_NAME.get(name, name),
-                            "Gold Earned": gold,
-                            "Damage to Champs": dmg,
-                            "Vision Score": vis_score,
-                            "Control Wards": ctrl_wards,
-                            "KDA": round(kda, 2),
-                            "Kills": kills,
-                            "Deaths": deaths,
-                            "Assists": assists
-                        })
+                tournament_totals = filtered_totals(
+                    tournament_folder, tournament["fingerprint"], rosters_key(ROSTERS), roster_name,
+                    None, tournament["partials"][roster_name]
+                )
                 
-                if not tournament_stats:
+                if not tournament_totals["players"]:
                     st.warning("Aucune donnée de tournoi trouvée pour vos joueurs.")
                 else:
-                    df_tournament = pd.DataFrame(tournament_stats)
-                    
-                    # Calcul des moyennes par joueur
-                    avg_df = (
-                        df_tournament
-                            .groupby("Player", as_index=False)[["Gold Earned", "Damage to Champs", "Vision Score", "Control Wards", "KDA", "Kills", "Deaths", "Assists"]]
-                            .mean()
-                    )
-                    
-                    # Arrondir les valeurs
-                    for col in avg_df.columns:
-                        if col != "Player":
-                            avg_df[col] = avg_df[col].round(2)
+                    # Moyennes par joueur depuis les partiels fusionnés
+                    avg_df = player_averages(tournament_totals, roster)
                     
                     st.markdown("### Moyennes globales (tous matchs de tournoi)")
                     
                     # Affichage avec style
-                    st.dataframe(
+                    show_table(
                         avg_df.style.background_gradient(subset=['KDA', 'Vision Score', 'Damage to Champs'], cmap='Blues'),
                         hide_index=True,
                         use_container_width=True
@@ -870,137 +751,42 @@ def main():
                     st.markdown("### Visualisation des performances")
                     
                     # Graphique radar pour les performances par joueur
-                    fig = go.Figure()
-                    
-                    for player in avg_df["Player"]:
-                        player_data = avg_df[avg_df["Player"] == player].iloc[0]
-                        
-                        # Normalisation des données pour le radar
-                        categories = ['KDA', 'Vision Score', 'Damage to Champs', 'Gold Earned', 'Control Wards']
-                        values = [player_data[cat] for cat in categories]
-                        
-                        # Normalisation des valeurs
-                        max_values = avg_df[categories].max()
-                        normalized_values = [val / max_val for val, max_val in zip(values, max_values)]
-                        
-                        fig.add_trace(go.Scatterpolar(
-                            r=normalized_values,
-                            theta=categories,
-                            fill='toself',
-                            name=player
-                        ))
-                    
-                    fig.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 1]
-                            )),
-                        showlegend=True,
-                        title="Comparaison des performances par joueur"
+                    categories = ('KDA', 'Vision Score', 'Damage to Champs', 'Gold Earned', 'Control Wards')
+                    fig = comparison_radar(
+                        tuple(avg_df["Player"]),
+                        categories,
+                        tuple(map(tuple, avg_df[list(categories)].astype(float).to_numpy().tolist()))
                     )
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    show_chart(fig)
                     
                     # (Optionnel) Bouton pour afficher le détail match par match
                     if st.checkbox("Afficher le détail match par match"):
                         st.markdown("### Détail complet")
-                        st.dataframe(df_tournament, hide_index=True)
+                        # Une ligne par (match, joueur)
+                        df_tournament = match_details(
+                            roster_view(tournament_participants, tournament["sides"], roster_name, list(roster)),
+                            roster
+                        )
+                        show_table(df_tournament, hide_index=True)
 
     # ----------------------------------------------
-    # Onglet 4 : Drafts
+    # Vue 4 : Drafts
     # ----------------------------------------------
-    with tab4:
+    elif view == "Drafts":
         st.subheader("Analyse des compositions")
         
-        if not os.path.exists(json_folder):
+        if scrims is None:
             st.error(f"Le dossier '{json_folder}' n'existe pas.")
         else:
-            # Structure pour stocker les drafts
-            team_comps = []
-            
-            # Parcours des fichiers
-            for d, fname in date_files:
-                path = os.path.join(json_folder, fname)
-                with open(path, "r", encoding="utf-8") as f:
-                    match_data = json.load(f)
-
-                participants = match_data.get("participants", [])
-                if not participants:
-                    continue
-
-                # Identifier notre équipe
-                team_candidates = []
-                for p in participants:
-                    player_name = p.get("NAME", "")
-                    if player_name in TEAM_PLAYERS:
-                        team_candidates.append(p.get("TEAM"))
-
-                if not team_candidates:
-                    continue
-
-                c = Counter(team_candidates)
-                my_team = c.most_common(1)[0][0]
-
-                # Collecter le draft de notre équipe
-                current_draft = {"TOP": "", "JUNGLE": "", "MIDDLE": "", "BOTTOM": "", "UTILITY": "", "Result": ""}
-                for p in participants:
-                    if p.get("TEAM") == my_team:
-                        role_raw = p.get("TEAM_POSITION", "") or p.get("INDIVIDUAL_POSITION", "")
-                        role = ROLE_MAPPING.get(role_raw.upper(), "")
-                        if role:
-                            champ = p.get("SKIN", "Unknown")
-                            current_draft[role] = champ
-                
-                # Ajouter le résultat
-                current_draft["Result"] = "Win" if any(
-                    p.get("TEAM") == my_team and p.get("WIN", "").lower() == "win"
-                    for p in participants
-                ) else "Loss"
-                
-                team_comps.append(current_draft)
-
-            if team_comps:
+            if scrim_totals["matches"] > 0:
                 # Compositions complètes les plus jouées
                 st.markdown("### Compositions les plus jouées")
                 
-                # Convertir les drafts en tuples pour le comptage
-                full_comps = Counter(
-                    tuple(sorted((role, champ) for role, champ in comp.items() if role != "Result"))
-                    for comp in team_comps
-                )
+                # Compositions triées par nombre de games puis par winrate
+                df_comps = compositions(scrim_totals)
                 
-                # Créer un DataFrame pour les comps
-                comp_data = []
-                for comp, count in full_comps.most_common():
-                    # Calculer le winrate pour cette comp
-                    wins = sum(1 for draft in team_comps 
-                             if tuple(sorted((role, champ) for role, champ in draft.items() if role != "Result")) == comp 
-                             and draft["Result"] == "Win")
-                    winrate = (wins / count) * 100
-                    
-                    comp_dict = dict(comp)
-                    comp_data.append({
-                        "Games": count,
-                        "Winrate": winrate,
-                        "TOP": next((champ for role, champ in comp if role == "TOP"), ""),
-                        "JUNGLE": next((champ for role, champ in comp if role == "JUNGLE"), ""),
-                        "MIDDLE": next((champ for role, champ in comp if role == "MIDDLE"), ""),
-                        "BOTTOM": next((champ for role, champ in comp if role == "BOTTOM"), ""),
-                        "UTILITY": next((champ for role, champ in comp if role == "UTILITY"), "")
-                    })
-                
-                if comp_data:
-                    # Créer le DataFrame avec les données numériques
-                    df_comps = pd.DataFrame(comp_data)
-                    
-                    # Trier par nombre de games puis par winrate
-                    df_comps = df_comps.sort_values(['Games', 'Winrate'], ascending=[False, False])
-                    
-                    # Réorganiser les colonnes
-                    column_order = ['Games', 'Winrate', 'TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']
-                    df_comps = df_comps[column_order]
-                    
+                if not df_comps.empty:
                     # Appliquer le style sur les données numériques
                     styled_df = df_comps.style\
                         .background_gradient(subset=['Games'], cmap='Blues')\
@@ -1012,7 +798,7 @@ def main():
                         'Games': '{:.0f}'
                     })
                     
-                    st.dataframe(
+                    show_table(
                         styled_df,
                         hide_index=True,
                         use_container_width=True
@@ -1020,5 +806,133 @@ def main():
                 else:
                     st.write("Pas de compositions complètes trouvées")
 
+                # Duos les plus joués sur une paire de rôles (index par paire)
+                st.markdown("### Meilleurs duos")
+                role_a, role_b = st.selectbox(
+                    "Paire de rôles",
+                    ROLE_PAIRS,
+                    index=ROLE_PAIRS.index(("JUNGLE", "MIDDLE")),
+                    format_func=lambda pair: f"{pair[0]} + {pair[1]}"
+                )
+                df_duos = duos(scrim_totals, role_a, role_b)
+
+                if not df_duos.empty:
+                    show_table(
+                        df_duos.style
+                            .background_gradient(subset=['Games'], cmap='Blues')
+                            .background_gradient(subset=['Winrate'], cmap='RdYlGn')
+                            .format({'Winrate': '{:.1f}%', 'Games': '{:.0f}'}),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                else:
+                    st.write("Pas de duos trouvés pour cette paire de rôles")
+
+                # Face-à-face : notre champion contre le champion adverse du même rôle
+                st.markdown("### Matchups")
+                col1, col2 = st.columns(2)
+                with col1:
+                    matchup_role = st.selectbox("Rôle", ROLES, key="matchup_role")
+                df_matchups = matchups(scrim_totals, matchup_role)
+                with col2:
+                    enemy = st.selectbox(
+                        "Champion adverse",
+                        ["Tous"] + sorted(df_matchups["Adversaire"].unique()),
+                        key="matchup_enemy"
+                    )
+                if enemy != "Tous":
+                    df_matchups = df_matchups[df_matchups["Adversaire"] == enemy]
+
+                if not df_matchups.empty:
+                    formats = {
+                        'Winrate': '{:.1f}%',
+                        'Games': '{:.0f}',
+                        'GOLD_DIFF_AT_15': '{:+.0f}',
+                        'CS_DIFF_AT_15': '{:+.1f}',
+                        'GOLD_DIFF': '{:+.0f}'
+                    }
+                    show_table(
+                        df_matchups.style
+                            .background_gradient(subset=['Winrate'], cmap='RdYlGn')
+                            .format(
+                                {column: fmt for column, fmt in formats.items() if column in df_matchups},
+                                na_rep="-"
+                            ),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                else:
+                    st.write("Pas de matchups trouvés pour ce rôle")
+
+    # ----------------------------------------------
+    # Vue 5 : Requêtes SQL (base embarquée)
+    # ----------------------------------------------
+    elif view == "Requêtes SQL":
+        st.subheader("Requêtes SQL")
+
+        sql_folders = [folder for folder in DEFAULT_FOLDERS if os.path.exists(folder)]
+        if not sql_folders:
+            st.error("Aucun dossier de matchs trouvé.")
+        else:
+            sql_folder = st.selectbox("Données", sql_folders, key="sql_folder")
+            data = scrims if sql_folder == json_folder else load_folder(sql_folder, DEFAULT_FOLDERS[sql_folder])
+            database = get_database()
+            with stage("synchronisation SQL"):
+                database.sync(
+                    sql_folder, data["fingerprint"], rosters_key(ROSTERS), data["participants"], data["sides"]
+                )
+
+            preset = st.selectbox("Requête", list(QUERIES) + ["Requête libre"], key="sql_preset")
+            sql = st.text_area(
+                "SQL",
+                QUERIES.get(preset, "SELECT * FROM selected WHERE folder = :folder AND roster = :roster LIMIT 100").strip(),
+                height=300,
+                key=f"sql_text_{preset}"
+            )
+            st.caption(
+                "Paramètres : :folder (dossier choisi) et :roster (roster affiché). "
+                "La vue `selected` ne contient que les matchs retenus par les filtres de la sidebar (scrims)."
+            )
+            with st.expander("Schéma"):
+                for name, columns in database.columns().items():
+                    st.markdown(f"**{name}** : {', '.join(columns)}")
+
+            try:
+                with stage("requête SQL"):
+                    result = database.query(
+                        sql, sql_folder, roster_name, selected if sql_folder == json_folder else None
+                    )
+            except QUERY_ERRORS as e:
+                st.error(f"Erreur SQL : {e}")
+            else:
+                st.write(f"**{len(result)} lignes**")
+                show_table(result, hide_index=True, use_container_width=True)
+
+def main():
+    """
+    Rendu du dashboard, instrumenté si DASHBOARD_PROFILE=1 ou ?profile=1 :
+    le rapport du rerun est affiché dans la sidebar et ajouté au journal
+    JSON (instrumentation.PROFILE_LOG).
+    """
+    if not profiling_enabled(st.query_params.get("profile")):
+        render_dashboard()
+        return
+
+    profiler = Profiler()
+    profiler.watch("MatchCache", get_match_cache().stats)
+    profiler.watch("PartialCache", get_partial_cache().stats)
+    profiler.watch("IconStore", get_icon_store().stats)
+    profiler.watch("figures", figure_cache_stats)
+    token = activate(profiler)
+    try:
+        with profiler.stage("rerun"):
+            render_dashboard()
+    finally:
+        deactivate(token)
+    profiler.label = st.session_state.get("view", "")
+    report = profiler.report()
+    write_log(report)
+    instrumentation_panel(report)
+
 if __name__ == "__main__":
     main()
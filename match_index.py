@@ -0,0 +1,81 @@
+"""
+Index temporel des matchs : une entrée par match, triée par date, numéro de
+game puis nom de fichier, avec le patch (ex : '15.1') tiré du gameVersion.
+
+Les filtres de date sélectionnent une tranche par recherche dichotomique
+(np.searchsorted, les matchs non datés étant rangés à la fin) ; le filtre de
+patch ne s'applique qu'à cette tranche. Le coût d'une vue filtrée est donc
+proportionnel à la tranche, pas à l'archive.
+"""
+import numpy as np
+import pandas as pd
+
+from ddragon import patch_of
+
+
+class MatchIndex:
+    """
+    Index trié des matchs d'une table de participants.
+    """
+
+    def __init__(self, fnames, dates, games, patches):
+        self.fnames = np.asarray(fnames, dtype=object)
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.games = np.asarray(games)
+        self.patches = np.asarray(patches, dtype=object)
+
+    @classmethod
+    def from_participants(cls, table):
+        """
+        Construit l'index depuis une table de participants (une entrée par
+        valeur de la colonne `match`).
+        """
+        matches = (
+            table.groupby("match", sort=True)[["fname", "date", "game", "game_version"]]
+                .first()
+                .sort_values(["date", "game", "fname"], kind="stable", na_position="last")
+        )
+        patches = [patch_of(version) for version in matches["game_version"].astype(str)]
+        return cls(
+            matches["fname"].astype(str).to_numpy(),
+            pd.to_datetime(matches["date"]).to_numpy(dtype="datetime64[ns]"),
+            matches["game"].fillna(0).astype(int).to_numpy(),
+            patches
+        )
+
+    def __len__(self):
+        return len(self.fnames)
+
+    def date_bounds(self):
+        """
+        (première date, dernière date) des matchs datés, ou (None, None).
+        """
+        dated = self.dates[~np.isnat(self.dates)]
+        if len(dated) == 0:
+            return None, None
+        return pd.Timestamp(dated[0]).date(), pd.Timestamp(dated[-1]).date()
+
+    def patch_list(self):
+        """
+        Patchs présents, du plus ancien au plus récent.
+        """
+        known = {p for p in self.patches if p}
+        return sorted(known, key=lambda p: tuple(int(x) for x in p.split(".")))
+
+    def select(self, start=None, end=None, patches=None):
+        """
+        Retourne les fichiers des matchs entre `start` et `end` (dates
+        incluses, None = pas de borne) et, si fourni, dans `patches`.
+        """
+        lo, hi = 0, len(self.dates)
+        if start is not None:
+            lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        if end is not None:
+            end_exclusive = pd.Timestamp(end) + pd.Timedelta(days=1)
+            hi = np.searchsorted(self.dates, np.datetime64(end_exclusive, "ns"), side="left")
+
+        fnames = self.fnames[lo:hi]
+        if patches:
+            mask = np.isin(self.patches[lo:hi], list(patches))
+            fnames = fnames[mask]
+        return list(fnames)
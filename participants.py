@@ -0,0 +1,220 @@
+"""
+Table colonnaire des participants.
+
+Les fichiers de match stockent chaque participant sous forme d'un dict de ~191
+champs texte. On construit une seule fois, à l'ingestion, une table pandas
+typée (une ligne par match × participant) sur laquelle tous les onglets font
+des groupby vectorisés au lieu de re-parser les chaînes à chaque boucle.
+"""
+import numpy as np
+import pandas as pd
+
+ROLE_MAPPING = {
+    "TOP": "TOP",
+    "JUNGLE": "JUNGLE",
+    "MIDDLE": "MIDDLE",
+    "MID": "MIDDLE",
+    "BOTTOM": "BOTTOM",
+    "BOT": "BOTTOM",
+    "UTILITY": "UTILITY",
+    "SUPPORT": "UTILITY"
+}
+
+ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+# Champs numériques utilisés par le dashboard -> dtype de stockage
+NUMERIC_FIELDS = {
+    "CHAMPIONS_KILLED":                "int32",
+    "NUM_DEATHS":                      "int32",
+    "ASSISTS":                         "int32",
+    "GOLD_EARNED":                     "int32",
+    "TOTAL_DAMAGE_DEALT_TO_CHAMPIONS": "int32",
+    "DRAGON_KILLS":                    "int32",
+    "BARON_KILLS":                     "int32",
+    "RIFT_HERALD_KILLS":               "int32",
+    "TURRET_TAKEDOWNS":                "int32",
+    "HORDE_KILLS":                     "int32",
+    "TIME_PLAYED":                     "int32",
+    "MINIONS_KILLED":                  "int32",
+    "VISION_SCORE":                    "int32",
+    "VISION_WARDS_BOUGHT_IN_GAME":     "int32",
+    "WARD_KILLED":                     "int32",
+    "MINIONS_KILLED_AT_15":            "float32",
+    "CS_DIFF_AT_15":                   "float32",
+    "GOLD_DIFF_AT_15":                 "float32",
+    "XP_DIFF_AT_15":                   "float32",
+}
+
+# Champs numériques absents de certaines données (stats à 15 minutes) :
+# laissés à NaN plutôt que 0 pour ne pas afficher une fausse valeur nulle
+OPTIONAL_FIELDS = ["MINIONS_KILLED_AT_15", "CS_DIFF_AT_15", "GOLD_DIFF_AT_15", "XP_DIFF_AT_15"]
+
+# Champs texte stockés en catégories
+CATEGORICAL_FIELDS = ["NAME", "PUUID", "TEAM", "SKIN", "TEAM_POSITION"]
+
+# Champs bruts lus par build_participant_table : projection à passer au
+# décodage (MatchCache(fields=...)) pour ignorer les ~160 autres champs
+PARTICIPANT_FIELDS = tuple(
+    CATEGORICAL_FIELDS + ["INDIVIDUAL_POSITION", "WIN"] + list(NUMERIC_FIELDS)
+)
+
+
+def _role_of(p):
+    """
+    Rôle standardisé d'un participant (TEAM_POSITION, sinon INDIVIDUAL_POSITION).
+    """
+    role_raw = p.get("TEAM_POSITION", "") or p.get("INDIVIDUAL_POSITION", "") or ""
+    return ROLE_MAPPING.get(role_raw.upper(), "")
+
+
+def build_participant_table(entries):
+    """
+    Construit la table des participants à partir des entrées de MatchCache.
+
+    Colonnes :
+      - match : indice du match dans `entries`
+      - match_id, fname, date, game, game_version : métadonnées du match
+      - NAME, PUUID, TEAM, SKIN, TEAM_POSITION : catégories
+      - ROLE : rôle standardisé (catégorie, "" si inconnu)
+      - WIN : booléen
+      - NUMERIC_FIELDS : entiers / flottants (0 si absent ou invalide, NaN
+        pour les OPTIONAL_FIELDS)
+    """
+    columns = {
+        "match": [], "match_id": [], "fname": [], "date": [], "game": [],
+        "game_version": [], "ROLE": [], "WIN": [],
+    }
+    for field in CATEGORICAL_FIELDS:
+        columns[field] = []
+    for field in NUMERIC_FIELDS:
+        columns[field] = []
+
+    for match_idx, entry in enumerate(entries):
+        match_data = entry["data"]
+        match_id = match_data.get("matchId", entry["fname"])
+        game_version = (match_data.get("gameVersion") or "").strip("\x00\x01 ")
+        for p in match_data.get("participants", []):
+            columns["match"].append(match_idx)
+            columns["match_id"].append(match_id)
+            columns["fname"].append(entry["fname"])
+            columns["date"].append(entry["date"])
+            columns["game"].append(entry["game"])
+            columns["game_version"].append(game_version)
+            columns["ROLE"].append(_role_of(p))
+            columns["WIN"].append((p.get("WIN") or "").lower() == "win")
+            columns["NAME"].append(p.get("NAME") or "")
+            columns["PUUID"].append(p.get("PUUID") or "")
+            columns["TEAM"].append(p.get("TEAM") or "")
+            columns["SKIN"].append(p.get("SKIN") or "Unknown")
+            columns["TEAM_POSITION"].append(p.get("TEAM_POSITION") or "")
+            for field in NUMERIC_FIELDS:
+                columns[field].append(p.get(field))
+
+    table = pd.DataFrame({
+        "match":    np.asarray(columns["match"], dtype="int32"),
+        "match_id": pd.Categorical(columns["match_id"]),
+        "fname":    pd.Categorical(columns["fname"]),
+        "date":     pd.to_datetime(columns["date"]),
+        "game":     pd.array(columns["game"], dtype="Int16"),
+        "game_version": pd.Categorical(columns["game_version"]),
+        "ROLE":     pd.Categorical(columns["ROLE"], categories=ROLES + [""]),
+        "WIN":      np.asarray(columns["WIN"], dtype=bool),
+    })
+    for field in CATEGORICAL_FIELDS:
+        table[field] = pd.Categorical(columns[field])
+    for field, dtype in NUMERIC_FIELDS.items():
+        values = pd.to_numeric(pd.Series(columns[field], dtype=object), errors="coerce")
+        if field not in OPTIONAL_FIELDS:
+            values = values.fillna(0)
+        table[field] = values.astype(dtype)
+    return table
+
+
+def concat_participant_tables(tables):
+    """
+    Concatène plusieurs tables de participants (ex : snapshot + fichiers
+    récents) et renumérote la colonne `match` dans l'ordre chronologique
+    (date, numéro de game, nom de fichier).
+    """
+    tables = [t for t in tables if not t.empty]
+    if not tables:
+        return build_participant_table([])
+    if len(tables) == 1:
+        table = tables[0].copy()
+    else:
+        table = pd.concat(tables, ignore_index=True)
+        for field in ["match_id", "fname", "game_version", "ROLE"] + CATEGORICAL_FIELDS:
+            table[field] = table[field].astype("category")
+        table["ROLE"] = table["ROLE"].cat.set_categories(ROLES + [""])
+
+    table["match"] = (
+        table.groupby(["date", "game", "fname"], sort=True, dropna=False, observed=True)
+            .ngroup()
+            .astype("int32")
+    )
+    return table.sort_values("match", kind="stable").reset_index(drop=True)
+
+
+def tag_rosters(table, identities):
+    """
+    Marque en une passe tous les rosters connus : pour chaque match, le côté
+    de chaque roster présent (celui où apparaît le plus de ses joueurs, en
+    cas d'égalité celui du premier rencontré).
+
+    identities : IdentityIndex (rosters.py), qui reconnaît les joueurs par
+    PUUID puis par pseudo.
+
+    Retourne (table, sides) : une copie de la table avec les colonnes PLAYER
+    (joueur de la configuration, NaN sinon) et ROSTER (son roster), et la
+    Series (match, ROSTER) -> code de l'équipe (TEAM.cat.codes) du roster
+    dans ce match.
+    """
+    table = table.copy()
+    table["PLAYER"] = identities.resolve(table["PUUID"], table["NAME"]).to_numpy()
+    table["ROSTER"] = pd.Categorical(
+        table["PLAYER"].map(identities.roster_of),
+        categories=list(dict.fromkeys(identities.roster_of.values()))
+    )
+
+    members = table.loc[table["ROSTER"].notna(), ["match", "ROSTER", "TEAM"]]
+    members = members.assign(
+        team_code=members["TEAM"].cat.codes,
+        position=np.arange(len(members))
+    )
+    sides = (
+        members.groupby(["match", "ROSTER", "team_code"], observed=True)
+            .agg(n=("position", "size"), first=("position", "min"))
+            .reset_index()
+            .sort_values(["match", "ROSTER", "n", "first"], ascending=[True, True, False, True])
+            .drop_duplicates(["match", "ROSTER"])
+            .set_index(["match", "ROSTER"])["team_code"]
+    )
+    return table, sides
+
+
+def roster_view(table, sides, roster, players):
+    """
+    Vue d'un roster sur une table passée par tag_rosters : seulement les
+    matchs où il est présent, avec les colonnes IS_ROSTER (le participant
+    est un joueur du roster) et OUR_TEAM (il joue dans l'équipe du roster),
+    attendues par reduce_matches et stats.match_details.
+    """
+    roster_sides = sides[sides.index.get_level_values("ROSTER") == roster].droplevel("ROSTER")
+    view = table[table["match"].isin(roster_sides.index)].copy()
+    view["IS_ROSTER"] = view["PLAYER"].isin(players).to_numpy()
+    view["OUR_TEAM"] = (view["TEAM"].cat.codes == view["match"].map(roster_sides)).to_numpy()
+    return view
+
+
+def build_match_table(table):
+    """
+    Agrège les lignes OUR_TEAM par match : une ligne par match où nos joueurs
+    sont présents, avec le résultat (WIN) et les sommes d'équipe des champs
+    numériques. Attend une table passée par roster_view.
+    """
+    ours = table[table["OUR_TEAM"]]
+    numeric = list(NUMERIC_FIELDS)
+    matches = ours.groupby("match")[numeric].sum()
+    matches["WIN"] = ours.groupby("match")["WIN"].any()
+    matches["GAME_MINUTES"] = ours.groupby("match")["TIME_PLAYED"].sum() / 60
+    return matches
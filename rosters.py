@@ -0,0 +1,107 @@
+"""
+Configuration des rosters suivis par le dashboard et résolution d'identité.
+
+rosters.json associe à chaque roster ses joueurs, dans l'ordre d'affichage.
+La clé d'un joueur est son identifiant stable dans le dashboard ; il est
+reconnu dans les matchs par PUUID, et à défaut par ses pseudos (aliases) :
+
+    {
+        "Ancient Ones": {
+            "Peche": {"puuids": ["d7e67609-..."], "aliases": ["Peche le coquin"]},
+            "kross": {"aliases": ["gumaguccy"]}
+        }
+    }
+
+La forme courte {"pseudo": "nom affiché"} reste acceptée (alias = pseudo).
+
+Un pseudo n'est utilisé que si le PUUID du participant est inconnu ; pour
+un joueur dont les PUUID sont configurés, seulement si le participant n'a
+pas de PUUID du tout (un pseudo repris par quelqu'un d'autre ne lui est donc
+pas attribué).
+"""
+import json
+
+ROSTERS_FILE = "rosters.json"
+
+
+def _player_entry(player, value):
+    """
+    Normalise la configuration d'un joueur en {"display", "puuids", "aliases"}.
+    """
+    if not isinstance(value, dict):
+        return {"display": str(value or player), "puuids": [], "aliases": [player]}
+    return {
+        "display": str(value.get("display") or player),
+        "puuids":  [str(puuid) for puuid in value.get("puuids", [])],
+        "aliases": [str(alias) for alias in value.get("aliases", [player])],
+    }
+
+
+def load_rosters(path=ROSTERS_FILE):
+    """
+    Lit la configuration des rosters. Retourne {nom du roster: {joueur:
+    {"display", "puuids", "aliases"}}}, ou {} si le fichier est absent ou
+    illisible.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rosters = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        str(name): {str(player): _player_entry(str(player), value) for player, value in players.items()}
+        for name, players in rosters.items()
+        if isinstance(players, dict) and players
+    }
+
+
+def display_names(roster):
+    """
+    {joueur: nom affiché} d'un roster, dans l'ordre de la configuration.
+    """
+    return {player: entry["display"] for player, entry in roster.items()}
+
+
+def rosters_key(rosters):
+    """
+    Clé hashable d'une configuration (rosters, joueurs, PUUID et pseudos),
+    pour les caches des tables dérivées.
+    """
+    return tuple(
+        (name, tuple(
+            (player, tuple(entry["puuids"]), tuple(entry["aliases"]))
+            for player, entry in players.items()
+        ))
+        for name, players in rosters.items()
+    )
+
+
+class IdentityIndex:
+    """
+    Index PUUID / pseudo -> joueur, et joueur -> roster. Un joueur listé
+    dans plusieurs rosters appartient au premier.
+    """
+
+    def __init__(self, rosters=None):
+        self.by_puuid = {}
+        self.by_alias = {}             # joueurs sans PUUID configuré
+        self.by_alias_no_puuid = {}    # joueurs avec PUUID : participants sans PUUID
+        self.roster_of = {}
+        for name, players in (rosters or {}).items():
+            for player, entry in players.items():
+                self.roster_of.setdefault(player, name)
+                for puuid in entry["puuids"]:
+                    self.by_puuid.setdefault(puuid, player)
+                aliases = self.by_alias_no_puuid if entry["puuids"] else self.by_alias
+                for alias in entry["aliases"]:
+                    aliases.setdefault(alias, player)
+
+    def resolve(self, puuids, names):
+        """
+        Joueur (clé de configuration) de chaque participant, NaN si inconnu.
+        puuids / names : Series alignées (colonnes PUUID et NAME).
+        """
+        players = puuids.map(self.by_puuid).astype(object)
+        players = players.fillna(names.map(self.by_alias).astype(object))
+        no_puuid = names.map(self.by_alias_no_puuid).astype(object).where(puuids == "")
+        return players.fillna(no_puuid)
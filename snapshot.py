@@ -0,0 +1,189 @@
+"""
+Snapshot colonnaire (Parquet) des participants déjà parsés.
+
+Une étape de compaction convertit les fichiers JSON bruts d'un dossier en un
+fichier Parquet accompagné d'un manifest (fichiers couverts + signatures).
+Au démarrage, le dashboard lit le snapshot (memory-map) et ne parse que les
+fichiers JSON nouveaux ou modifiés depuis la dernière compaction. Dès que
+AUTO_COMPACT_FILES fichiers ont dû être parsés, la table complète est
+réécrite en snapshot : le coût d'un rafraîchissement reste borné par ce seuil
+au lieu de grandir avec l'archive.
+
+Usage :
+    python snapshot.py scrims_json tournoi_json
+"""
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from ingestion import MatchCache, scan_folder
+from instrumentation import count, stage
+from participants import OPTIONAL_FIELDS, PARTICIPANT_FIELDS, build_participant_table, concat_participant_tables
+
+SNAPSHOT_DIR = "snapshots"
+
+# Nombre de fichiers parsés hors snapshot à partir duquel load_participants
+# réécrit le snapshot
+AUTO_COMPACT_FILES = 100
+
+# Dossiers compactés par défaut -> require_date (format 'DD_MM_YYYY_GX.json')
+DEFAULT_FOLDERS = {
+    "scrims_json": True,
+    "tournoi_json": False
+}
+
+
+def snapshot_paths(folder, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Retourne (chemin du Parquet, chemin du manifest) pour un dossier de matchs.
+    """
+    name = os.path.basename(os.path.normpath(folder))
+    return (
+        os.path.join(snapshot_dir, f"{name}.parquet"),
+        os.path.join(snapshot_dir, f"{name}.manifest.json")
+    )
+
+
+def snapshot_schema():
+    """
+    Colonnes attendues dans un snapshot : un snapshot écrit avec un autre
+    schéma (ajout d'un champ, etc.) est ignoré et doit être recompacté. Les
+    champs optionnels (NaN si absents, voir OPTIONAL_FIELDS) sont marqués
+    d'un '?'.
+    """
+    return [
+        f"{column}?" if column in OPTIONAL_FIELDS else column
+        for column in build_participant_table([]).columns
+    ]
+
+
+def read_manifest(folder, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Lit le manifest d'un dossier. Retourne None s'il est absent, illisible ou
+    écrit avec un autre schéma.
+    """
+    data_path, manifest_path = snapshot_paths(folder, snapshot_dir)
+    if not (os.path.exists(data_path) and os.path.exists(manifest_path)):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("schema") != snapshot_schema():
+        return None
+    return manifest
+
+
+def compact_folder(folder, match_cache=None, require_date=True, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Parse tous les fichiers du dossier et écrit le snapshot + son manifest.
+    Les fichiers illisibles ne sont pas inscrits au manifest (ils seront
+    retentés au prochain chargement).
+
+    Retourne le manifest écrit.
+    """
+    match_cache = match_cache or MatchCache(fields=PARTICIPANT_FIELDS)
+    files = scan_folder(folder, require_date)
+    entries, errors = match_cache.load_files(folder, files)
+    failed = {fname for fname, _ in errors}
+
+    table = build_participant_table(entries)
+    return write_snapshot(folder, table, files, failed, require_date, snapshot_dir)
+
+
+def write_snapshot(folder, table, files, failed=(), require_date=True, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Écrit `table` comme snapshot du dossier, avec un manifest couvrant les
+    fichiers de `files` hors `failed` (fichiers illisibles, absents de la
+    table). Retourne le manifest écrit.
+    """
+    manifest = {
+        "folder": folder,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "require_date": require_date,
+        "schema": snapshot_schema(),
+        "files": {
+            fname: list(signature)
+            for fname, signature in files.items()
+            if fname not in failed
+        }
+    }
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    data_path, manifest_path = snapshot_paths(folder, snapshot_dir)
+    # Écriture atomique : un lecteur ne voit jamais un snapshot à moitié écrit
+    # (fichiers temporaires propres à l'écrivain : CLI et dashboard peuvent
+    # compacter en même temps)
+    tmp = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    table.to_parquet(data_path + tmp, index=False)
+    os.replace(data_path + tmp, data_path)
+    with open(manifest_path + tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + tmp, manifest_path)
+    return manifest
+
+
+def load_participants(folder, match_cache, require_date=True, files=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Charge la table des participants d'un dossier : lignes du snapshot pour
+    les fichiers inchangés, parsing JSON (via match_cache) pour les autres.
+    Les matchs du cache qui ne sont plus dans le dossier en sont retirés.
+    Si AUTO_COMPACT_FILES fichiers ou plus ont été parsés, la table obtenue
+    devient le nouveau snapshot.
+
+    files : résultat de scan_folder, si déjà calculé.
+
+    Retourne (table, errors).
+    """
+    if files is None:
+        files = scan_folder(folder, require_date)
+
+    manifest = read_manifest(folder, snapshot_dir)
+    snapshot_files = manifest["files"] if manifest else {}
+    covered = {
+        fname for fname, signature in files.items()
+        if snapshot_files.get(fname) == list(signature)
+    }
+    fresh = {fname: signature for fname, signature in files.items() if fname not in covered}
+
+    tables = []
+    if covered:
+        data_path, _ = snapshot_paths(folder, snapshot_dir)
+        with stage("lecture snapshot"):
+            snapshot = pd.read_parquet(data_path, memory_map=True)
+        tables.append(snapshot[snapshot["fname"].isin(covered)])
+        count("fichiers depuis le snapshot", len(covered))
+
+    match_cache.evict_missing(folder, files)
+    with stage("lecture JSON"):
+        entries, errors = match_cache.load_files(folder, fresh)
+    count("fichiers JSON demandés", len(fresh))
+    with stage("table des participants"):
+        tables.append(build_participant_table(entries))
+        table = concat_participant_tables(tables)
+
+    if len(entries) >= AUTO_COMPACT_FILES:
+        failed = {fname for fname, _ in errors}
+        try:
+            with stage("compaction automatique"):
+                write_snapshot(folder, table, files, failed, require_date, snapshot_dir)
+            count("compactions automatiques")
+        except OSError:
+            # Dossier de snapshots non inscriptible : on reparsera la prochaine fois
+            pass
+    return table, errors
+
+
+if __name__ == "__main__":
+    folders = sys.argv[1:] or list(DEFAULT_FOLDERS)
+    for folder in folders:
+        if not os.path.exists(folder):
+            print(f"Le dossier '{folder}' n'existe pas, ignoré.")
+            continue
+        manifest = compact_folder(folder, require_date=DEFAULT_FOLDERS.get(folder, True))
+        print(f"{folder} : {len(manifest['files'])} fichiers compactés")
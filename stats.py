@@ -0,0 +1,229 @@
+"""
+Statistiques du dashboard, sans Streamlit.
+
+Chaque fonction prend un partiel fusionné (voir aggregates.py : merge_partials
+des matchs sélectionnés) et retourne un DataFrame / une Series prête à
+afficher. main.py ne fait que le rendu : les mêmes calculs peuvent être mis en
+cache par jeu de filtres, chronométrés (benchmark.py) ou lancés hors du thread
+de l'interface.
+
+display_name : dict joueur (PLAYER) -> nom affiché (la clé sinon).
+"""
+import numpy as np
+import pandas as pd
+
+from aggregates import (
+    LANE_DIFF_FIELDS, champions_frame, comps_frame, duos_frame, matchups_frame, players_frame, roles_frame
+)
+from participants import ROLES
+
+
+def _display(names, display_name):
+    display_name = display_name or {}
+    return [display_name.get(name, name) for name in names]
+
+
+def team_summary(totals):
+    """
+    Moyennes d'équipe par partie (objectifs, combat, vision), à 0 si aucun
+    match.
+    """
+    games = totals["matches"]
+    team = totals["team"]
+    minutes = team.get("GAME_MINUTES", 0)
+
+    def per_game(field):
+        return team.get(field, 0) / games if games else 0.0
+
+    def per_minute(field):
+        return team.get(field, 0) / minutes if minutes else 0.0
+
+    return pd.Series({
+        "games":          games,
+        "wins":           totals["wins"],
+        "win_rate":       totals["wins"] / games * 100 if games else 0.0,
+        "dragons":        per_game("DRAGON_KILLS"),
+        "barons":         per_game("BARON_KILLS"),
+        "heralds":        per_game("RIFT_HERALD_KILLS"),
+        "towers":         per_game("TURRET_TAKEDOWNS"),
+        "grubs":          per_game("HORDE_KILLS"),
+        "kills":          per_game("CHAMPIONS_KILLED"),
+        "deaths":         per_game("NUM_DEATHS"),
+        "damage_per_min": per_minute("TOTAL_DAMAGE_DEALT_TO_CHAMPIONS"),
+        "vision_score":   per_game("VISION_SCORE"),
+        "vision_per_min": per_minute("VISION_SCORE"),
+        "control_wards":  per_game("VISION_WARDS_BOUGHT_IN_GAME"),
+        "wards_killed":   per_game("WARD_KILLED"),
+    })
+
+
+def player_summary(totals, order=None, display_name=None):
+    """
+    Moyennes par joueur de l'onglet "Statistiques générales" (une ligne par
+    joueur, dans l'ordre `order` si fourni).
+    """
+    players = players_frame(totals, order)
+    nb = players["NbGames"]
+    avg_gold = players["Gold"] / nb
+    avg_dmg = players["Damage"] / nb
+    return pd.DataFrame({
+        "Joueur":       _display(players.index, display_name),
+        "Parties":      nb.astype(int),
+        "KDA":          (players["Kills"] + players["Assists"]) / players["Deaths"].clip(lower=1),
+        "Kills/Game":   players["Kills"] / nb,
+        "Deaths/Game":  players["Deaths"] / nb,
+        "Assists/Game": players["Assists"] / nb,
+        "KP (%)":       players["KP"] / nb,
+        # Gold Efficiency approx
+        "Gold Efficiency (%)": (avg_dmg / avg_gold * 100).where(avg_gold > 0, 0)
+    })
+
+
+def player_averages(totals, display_name=None):
+    """
+    Moyennes par joueur de l'onglet "Tournoi", triées par nom affiché et
+    arrondies à 2 décimales.
+    """
+    players = players_frame(totals)
+    nb = players["NbGames"]
+    averages = pd.DataFrame({
+        "Player":           _display(players.index, display_name),
+        "Gold Earned":      players["Gold"] / nb,
+        "Damage to Champs": players["Damage"] / nb,
+        "Vision Score":     players["Vision"] / nb,
+        "Control Wards":    players["ControlWards"] / nb,
+        "KDA":              players["KDA"] / nb,
+        "Kills":            players["Kills"] / nb,
+        "Deaths":           players["Deaths"] / nb,
+        "Assists":          players["Assists"] / nb
+    }).sort_values("Player").reset_index(drop=True)
+
+    numeric = averages.columns.drop("Player")
+    averages[numeric] = averages[numeric].round(2)
+    return averages
+
+
+def match_details(participants, display_name=None):
+    """
+    Une ligne par (match, joueur de notre roster) avec ses stats brutes.
+    Attend une table passée par roster_view.
+    """
+    roster = participants[participants["IS_ROSTER"]]
+    return pd.DataFrame({
+        "Match":            roster["match_id"].astype(str),
+        "Player":           pd.Series(_display(roster["PLAYER"].astype(str), display_name), index=roster.index),
+        "Gold Earned":      roster["GOLD_EARNED"],
+        "Damage to Champs": roster["TOTAL_DAMAGE_DEALT_TO_CHAMPIONS"],
+        "Vision Score":     roster["VISION_SCORE"],
+        "Control Wards":    roster["VISION_WARDS_BOUGHT_IN_GAME"],
+        "KDA":              ((roster["CHAMPIONS_KILLED"] + roster["ASSISTS"]) / roster["NUM_DEATHS"].clip(lower=1)).round(2),
+        "Kills":            roster["CHAMPIONS_KILLED"],
+        "Deaths":           roster["NUM_DEATHS"],
+        "Assists":          roster["ASSISTS"]
+    })
+
+
+# Métriques des séries temporelles par joueur (voir player_form)
+FORM_METRICS = ["KDA", "KP (%)", "Gold Efficiency (%)", "Vision/min"]
+
+
+def player_form(participants, window=5, method="rolling", display_name=None):
+    """
+    Séries par game de chaque joueur (KDA, KP, Gold Efficiency, vision par
+    minute), lissées sur les `window` dernières games de ce joueur :
+    moyenne glissante (method="rolling") ou exponentielle (method="ewm",
+    span=window). Calcul vectorisé par groupby, sans boucle par joueur.
+
+    Attend une table passée par roster_view, ordonnée par match. Retourne
+    une ligne par (match, joueur) avec les colonnes Partie (rang du match
+    dans la sélection), date, Joueur et FORM_METRICS.
+    """
+    columns = ["Partie", "date", "Joueur"] + FORM_METRICS
+    roster = participants[participants["IS_ROSTER"]]
+    if roster.empty:
+        return pd.DataFrame(columns=columns)
+
+    team_kills = participants[participants["OUR_TEAM"]].groupby("match")["CHAMPIONS_KILLED"].sum()
+    kills_assists = roster["CHAMPIONS_KILLED"] + roster["ASSISTS"]
+    match_kills = roster["match"].map(team_kills)
+    minutes = roster["TIME_PLAYED"] / 60
+    per_game = pd.DataFrame({
+        "PLAYER":              roster["PLAYER"].astype(str),
+        "KDA":                 kills_assists / roster["NUM_DEATHS"].clip(lower=1),
+        "KP (%)":              (kills_assists / match_kills.where(match_kills > 0) * 100).fillna(0),
+        "Gold Efficiency (%)": (roster["TOTAL_DAMAGE_DEALT_TO_CHAMPIONS"] / roster["GOLD_EARNED"].where(roster["GOLD_EARNED"] > 0) * 100).fillna(0),
+        "Vision/min":          (roster["VISION_SCORE"] / minutes.where(minutes > 0)).fillna(0),
+    }).astype({metric: "float64" for metric in FORM_METRICS})
+
+    grouped = per_game.groupby("PLAYER", sort=False)[FORM_METRICS]
+    if method == "ewm":
+        smoothed = grouped.ewm(span=window).mean()
+    else:
+        smoothed = grouped.rolling(window, min_periods=1).mean()
+    smoothed = smoothed.reset_index(level=0, drop=True).reindex(per_game.index)
+
+    form = pd.DataFrame({
+        "Partie": roster["match"].rank(method="dense").astype(int),
+        "date":   roster["date"],
+        "Joueur": _display(per_game["PLAYER"], display_name),
+    }, index=roster.index)
+    return pd.concat([form, smoothed], axis=1)[columns].reset_index(drop=True)
+
+
+def role_distribution(totals):
+    """
+    Gold / dégâts moyens par partie et part (%) de chaque rôle.
+    """
+    games = totals["matches"] or 1
+    role_means = roles_frame(totals) / games
+    role_shares = role_means / role_means.sum().replace(0, np.nan) * 100
+    return pd.DataFrame({
+        "Rôle":       ROLES,
+        "Gold":       role_means["Gold"].to_numpy(),
+        "Gold (%)":   role_shares["Gold"].fillna(0).to_numpy(),
+        "Damage":     role_means["Damage"].to_numpy(),
+        "Damage (%)": role_shares["Damage"].fillna(0).to_numpy()
+    })
+
+
+def champion_pool(totals):
+    """
+    Champions joués par chaque joueur (PLAYER, SKIN, games, wins, winrate),
+    triés par games puis winrate décroissants.
+    """
+    champions = champions_frame(totals)
+    champions["winrate"] = champions["wins"] / champions["games"] * 100
+    return champions.sort_values(["games", "winrate"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _ranked(frame, columns):
+    """
+    Trie par Games puis Winrate décroissants et ne garde que `columns`.
+    """
+    return frame.sort_values(["Games", "Winrate"], ascending=[False, False])[columns]
+
+
+def compositions(totals):
+    """
+    Compositions complètes (Games, Winrate, un champion par rôle), les plus
+    jouées en premier.
+    """
+    return _ranked(comps_frame(totals), ["Games", "Winrate"] + ROLES)
+
+
+def duos(totals, role_a, role_b):
+    """
+    Duos de champions sur la paire de rôles (role_a, role_b), les plus joués
+    en premier.
+    """
+    return _ranked(duos_frame(totals, role_a, role_b), ["Games", "Winrate", role_a, role_b])
+
+
+def matchups(totals, role):
+    """
+    Notre champion contre le champion adverse sur `role`, les plus joués en
+    premier. Les diffs de lane absents de toutes les games sont retirés.
+    """
+    frame = matchups_frame(totals, role)
+    lane_diffs = [field for field in LANE_DIFF_FIELDS if frame[field].notna().any()]
+    return _ranked(frame, ["Champion", "Adversaire", "Games", "Winrate"] + lane_diffs + ["GOLD_DIFF"])
@@ -0,0 +1,195 @@
+"""
+Surveillance des dossiers de matchs pour une ingestion en direct.
+
+Pendant un bloc de scrims, les nouvelles games sont déposées dans les
+dossiers de matchs. Le watcher tient à jour la liste des fichiers de chaque
+dossier ({fname: signature}, comme scan_folder) à partir des événements du
+système de fichiers (watchdog / inotify), ou à défaut par scrutation
+périodique. Avec watchdog, un re-listage complet plus espacé tourne aussi :
+il rattrape les dossiers créés après le démarrage et les montages réseau,
+sur lesquels inotify ne signale rien. Chaque fichier nouveau ou modifié est parsé tout de suite dans le
+MatchCache, puis la version du dossier est incrémentée : l'application n'a
+qu'à comparer cette version pour savoir qu'il faut rafraîchir ses agrégats,
+sans re-lister le dossier.
+"""
+import os
+import threading
+
+from bundles import is_bundle
+from ingestion import parse_date_from_filename, scan_folder
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# Intervalle de scrutation (secondes) quand watchdog n'est pas disponible
+POLL_INTERVAL = 2.0
+
+# Intervalle du re-listage de secours (secondes) quand watchdog est actif
+RESCAN_INTERVAL = 30.0
+
+
+class _FolderEventHandler(FileSystemEventHandler):
+    """
+    Transmet les événements watchdog d'un dossier au FolderWatcher.
+    """
+
+    def __init__(self, watcher, folder):
+        super().__init__()
+        self.watcher = watcher
+        self.folder = folder
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.folder):
+                self.watcher.refresh_file(self.folder, os.path.basename(path))
+
+
+class FolderWatcher:
+    """
+    Liste des fichiers de plusieurs dossiers, maintenue en arrière-plan.
+
+    folders : dict {dossier: require_date} (voir scan_folder).
+    match_cache : MatchCache dans lequel pré-parser les fichiers modifiés.
+    """
+
+    def __init__(self, folders, match_cache=None, poll_interval=POLL_INTERVAL, use_watchdog=True,
+                 rescan_interval=RESCAN_INTERVAL):
+        self.folders = dict(folders)
+        self.match_cache = match_cache
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.use_watchdog = use_watchdog and Observer is not None
+        self._files = {}     # dossier -> {fname: signature}
+        self._versions = {}  # dossier -> compteur de changements
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._observer = None
+        self._scheduled = set()  # dossiers suivis par l'observer watchdog
+        self._thread = None
+
+    @property
+    def backend(self):
+        return "watchdog" if self.use_watchdog else "polling"
+
+    def start(self):
+        """
+        Scanne une fois chaque dossier puis démarre la surveillance
+        (événements watchdog et re-listage de secours, ou scrutation seule).
+        """
+        self.rescan_all()
+
+        if self.use_watchdog:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+            for folder in self.folders:
+                self._schedule(folder)
+        interval = self.rescan_interval if self.use_watchdog else self.poll_interval
+        self._thread = threading.Thread(target=self._poll, args=(interval,), name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def files(self, folder):
+        """
+        Copie de la liste {fname: signature} d'un dossier surveillé.
+        """
+        with self._lock:
+            return dict(self._files.get(folder, {}))
+
+    def version(self, folder):
+        """
+        Compteur incrémenté à chaque fichier ajouté, modifié ou supprimé.
+        """
+        with self._lock:
+            return self._versions.get(folder, 0)
+
+    def rescan_all(self):
+        """
+        Re-liste tous les dossiers surveillés (démarrage, rechargement manuel).
+        """
+        for folder in self.folders:
+            self.rescan(folder)
+
+    def rescan(self, folder):
+        """
+        Re-liste entièrement un dossier (démarrage, scrutation) et ingère les
+        fichiers qui ont changé. Un dossier apparu depuis le démarrage est
+        ajouté à l'observer watchdog.
+        """
+        self._schedule(folder)
+        files = scan_folder(folder, self.folders[folder]) if os.path.isdir(folder) else {}
+        with self._lock:
+            previous = self._files.get(folder)
+            self._files[folder] = files
+        if previous is None:
+            # Premier scan : le chargement initial passe par le snapshot
+            return
+        changed = {fname: sig for fname, sig in files.items() if previous.get(fname) != sig}
+        if changed or set(previous) - set(files):
+            self._ingest(folder, changed)
+            self._bump(folder)
+
+    def refresh_file(self, folder, fname):
+        """
+        Met à jour un seul fichier après un événement (création, écriture,
+        renommage, suppression). Un lot modifié fait re-lister le dossier.
+        """
+        if is_bundle(fname):
+            self.rescan(folder)
+            return
+        if not fname.endswith(".json"):
+            return
+        if self.folders[folder] and parse_date_from_filename(fname) is None:
+            return
+        try:
+            st = os.stat(os.path.join(folder, fname))
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            files = self._files.setdefault(folder, {})
+            if files.get(fname) == signature:
+                return
+            if signature is None:
+                del files[fname]
+            else:
+                files[fname] = signature
+
+        if signature is not None:
+            self._ingest(folder, {fname: signature})
+        self._bump(folder)
+
+    def _schedule(self, folder):
+        if self._observer is None or folder in self._scheduled or not os.path.isdir(folder):
+            return
+        self._observer.schedule(_FolderEventHandler(self, folder), folder, recursive=False)
+        self._scheduled.add(folder)
+
+    def _ingest(self, folder, files):
+        # Un fichier encore en cours d'écriture échoue ici ; il sera relu à
+        # l'événement suivant (sa signature aura changé)
+        if self.match_cache is not None and files:
+            self.match_cache.load_files(folder, files)
+
+    def _bump(self, folder):
+        with self._lock:
+            self._versions[folder] = self._versions.get(folder, 0) + 1
+
+    def _poll(self, interval):
+        while not self._stop.wait(interval):
+            self.rescan_all()